@@ -1,6 +1,8 @@
 from logging.config import fileConfig
+from pathlib import Path
 
-from sqlalchemy import engine_from_config, pool
+import yaml
+from sqlalchemy import engine_from_config, make_url, pool
 from sqlmodel import SQLModel
 
 from alembic import context
@@ -8,6 +10,7 @@ from alembic import context
 # Import your models here so their metadata is registered with SQLModel.metadata
 # This assumes your models are discoverable from the app package.
 # You might need to adjust the import path based on your project structure.
+from app.internal.core.settings import DatabaseSettings, SqliteSettings
 from app.internal.models import *  # noqa: F403
 
 # this is the Alembic Config object, which provides
@@ -31,6 +34,34 @@ target_metadata = SQLModel.metadata
 # ... etc.
 
 
+def shard_count() -> int:
+    """``-x shards=N``, else ``database.shards`` from config.yaml if there is one."""
+    shards = context.get_x_argument(as_dictionary=True).get("shards")
+    if shards is not None:
+        return int(shards)
+
+    config_file = Path("config.yaml")
+    if not config_file.exists():
+        return 0
+    database = (yaml.safe_load(config_file.read_text()) or {}).get("database") or {}
+    return int(database.get("shards", 0))
+
+
+def database_urls() -> list[str]:
+    """The main database and, when sharded, every shard file next to it."""
+    url = make_url(config.get_main_option("sqlalchemy.url", "sqlite:///database.db"))
+    database = DatabaseSettings(
+        sqlite=SqliteSettings(file_name=url.database or ""), shards=shard_count()
+    )
+    return [
+        url.render_as_string(hide_password=False),
+        *(
+            url.set(database=file_name).render_as_string(hide_password=False)
+            for file_name in database.shard_file_names()
+        ),
+    ]
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -62,17 +93,20 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
-    )
-
-    with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
-
-        with context.begin_transaction():
-            context.run_migrations()
+    # Every shard has the full schema, so the same migrations apply to all
+    for url in database_urls():
+        connectable = engine_from_config(
+            config.get_section(config.config_ini_section, {}),
+            prefix="sqlalchemy.",
+            poolclass=pool.NullPool,
+            url=url,
+        )
+
+        with connectable.connect() as connection:
+            context.configure(connection=connection, target_metadata=target_metadata)
+
+            with context.begin_transaction():
+                context.run_migrations()
 
 
 if context.is_offline_mode():
@@ -0,0 +1,148 @@
+"""add sync change tracking
+
+Revision ID: 2d8c5e1a9f47
+Revises: 7b2e4d9a6c31
+Create Date: 2026-10-18 18:12:36.204117
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "2d8c5e1a9f47"
+down_revision: Union[str, None] = "7b2e4d9a6c31"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# The next data_version of the row's user. Writes bump data_version once, after
+# their statements, so every row a write changes gets the version it commits.
+NEXT_VERSION = "(SELECT data_version + 1 FROM users WHERE users.id = {table}.user_id)"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ("tasks", "tags"):
+        op.add_column(
+            table,
+            sa.Column("change_seq", sa.Integer(), nullable=False, server_default="0"),
+        )
+        # Existing rows count as changed by the last write of their user
+        op.execute(
+            f"""
+            UPDATE {table} SET change_seq = (
+                SELECT data_version FROM users WHERE users.id = {table}.user_id
+            )
+            """
+        )
+        op.create_index(
+            f"ix_{table}_user_id_change_seq", table, ["user_id", "change_seq"]
+        )
+
+    op.create_table(
+        "tombstones",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("change_seq", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_tombstones_user_id_change_seq", "tombstones", ["user_id", "change_seq"]
+    )
+
+    # Only the columns sent by GET /sync count as a change; the tag counters
+    # in particular change with every task write.
+    op.execute(
+        f"""
+        CREATE TRIGGER sync_after_task_insert
+        AFTER INSERT ON tasks BEGIN
+            UPDATE tasks SET change_seq = {NEXT_VERSION.format(table="tasks")}
+            WHERE id = new.id;
+        END
+        """
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER sync_after_task_update
+        AFTER UPDATE OF title, description, done ON tasks BEGIN
+            UPDATE tasks SET change_seq = {NEXT_VERSION.format(table="tasks")}
+            WHERE id = new.id;
+        END
+        """
+    )
+    # A task's tag_ids are part of the task
+    op.execute(
+        f"""
+        CREATE TRIGGER sync_after_link_insert
+        AFTER INSERT ON task_tag_links BEGIN
+            UPDATE tasks SET change_seq = {NEXT_VERSION.format(table="tasks")}
+            WHERE id = new.task_id;
+        END
+        """
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER sync_after_link_delete
+        AFTER DELETE ON task_tag_links BEGIN
+            UPDATE tasks SET change_seq = {NEXT_VERSION.format(table="tasks")}
+            WHERE id = old.task_id;
+        END
+        """
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER sync_after_tag_insert
+        AFTER INSERT ON tags BEGIN
+            UPDATE tags SET change_seq = {NEXT_VERSION.format(table="tags")}
+            WHERE id = new.id;
+        END
+        """
+    )
+    op.execute(
+        f"""
+        CREATE TRIGGER sync_after_tag_update
+        AFTER UPDATE OF name ON tags BEGIN
+            UPDATE tags SET change_seq = {NEXT_VERSION.format(table="tags")}
+            WHERE id = new.id;
+        END
+        """
+    )
+    for table, entity in (("tasks", "task"), ("tags", "tag")):
+        op.execute(
+            f"""
+            CREATE TRIGGER sync_after_{entity}_delete
+            AFTER DELETE ON {table} BEGIN
+                INSERT INTO tombstones (user_id, entity, entity_id, change_seq)
+                SELECT old.user_id, '{entity}', old.id, data_version + 1
+                FROM users WHERE users.id = old.user_id;
+            END
+            """
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for trigger in (
+        "tag_delete",
+        "task_delete",
+        "tag_update",
+        "tag_insert",
+        "link_delete",
+        "link_insert",
+        "task_update",
+        "task_insert",
+    ):
+        op.execute(f"DROP TRIGGER sync_after_{trigger}")
+    op.drop_index("ix_tombstones_user_id_change_seq", table_name="tombstones")
+    op.drop_table("tombstones")
+    for table in ("tags", "tasks"):
+        op.drop_index(f"ix_{table}_user_id_change_seq", table_name=table)
+        # Not a batch operation: rebuilding the table would trip over the
+        # triggers of earlier revisions that reference it
+        op.drop_column(table, "change_seq")
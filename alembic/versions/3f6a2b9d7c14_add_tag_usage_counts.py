@@ -0,0 +1,102 @@
+"""add tag usage counts
+
+Revision ID: 3f6a2b9d7c14
+Revises: e81a5f3c9b02
+Create Date: 2026-10-18 13:02:47.518306
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f6a2b9d7c14"
+down_revision: Union[str, None] = "e81a5f3c9b02"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("tags") as batch_op:
+        batch_op.add_column(
+            sa.Column("task_count", sa.Integer(), nullable=False, server_default="0")
+        )
+        batch_op.add_column(
+            sa.Column(
+                "open_task_count", sa.Integer(), nullable=False, server_default="0"
+            )
+        )
+    op.create_index("ix_task_tag_links_tag_id", "task_tag_links", ["tag_id"])
+
+    # Same statement as app.commands.reconcile_tag_counts
+    op.execute(
+        """
+        UPDATE tags SET
+            task_count = (
+                SELECT count(*) FROM task_tag_links
+                WHERE task_tag_links.tag_id = tags.id
+            ),
+            open_task_count = (
+                SELECT count(*) FROM task_tag_links
+                JOIN tasks ON tasks.id = task_tag_links.task_id
+                WHERE task_tag_links.tag_id = tags.id AND NOT tasks.done
+            )
+        """
+    )
+
+    # The counters follow every link insert/delete and every change of
+    # tasks.done, whichever code path (or bulk statement) makes it.
+    op.execute(
+        """
+        CREATE TRIGGER tag_counts_after_link_insert
+        AFTER INSERT ON task_tag_links BEGIN
+            UPDATE tags SET
+                task_count = task_count + 1,
+                open_task_count = open_task_count + coalesce(
+                    (SELECT NOT done FROM tasks WHERE id = new.task_id), 0
+                )
+            WHERE id = new.tag_id;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tag_counts_after_link_delete
+        AFTER DELETE ON task_tag_links BEGIN
+            UPDATE tags SET
+                task_count = task_count - 1,
+                open_task_count = open_task_count - coalesce(
+                    (SELECT NOT done FROM tasks WHERE id = old.task_id), 0
+                )
+            WHERE id = old.tag_id;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tag_counts_after_task_done
+        AFTER UPDATE OF done ON tasks WHEN old.done IS NOT new.done BEGIN
+            UPDATE tags SET
+                open_task_count = open_task_count
+                    + CASE WHEN new.done THEN -1 ELSE 1 END
+            WHERE id IN (
+                SELECT tag_id FROM task_tag_links WHERE task_id = new.id
+            );
+        END
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tag_counts_after_task_done")
+    op.execute("DROP TRIGGER tag_counts_after_link_delete")
+    op.execute("DROP TRIGGER tag_counts_after_link_insert")
+    op.drop_index("ix_task_tag_links_tag_id", table_name="task_tag_links")
+    with op.batch_alter_table("tags") as batch_op:
+        batch_op.drop_column("open_task_count")
+        batch_op.drop_column("task_count")
@@ -0,0 +1,27 @@
+"""add tasks user_id id index
+
+Revision ID: 5c1f0e9a7d21
+Revises: bae142034d6b
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5c1f0e9a7d21"
+down_revision: Union[str, None] = "bae142034d6b"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_tasks_user_id_id", "tasks", ["user_id", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_tasks_user_id_id", table_name="tasks")
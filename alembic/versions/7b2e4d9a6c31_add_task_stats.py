@@ -0,0 +1,126 @@
+"""add task stats
+
+Revision ID: 7b2e4d9a6c31
+Revises: 3f6a2b9d7c14
+Create Date: 2026-10-18 16:41:09.802315
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7b2e4d9a6c31"
+down_revision: Union[str, None] = "3f6a2b9d7c14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "task_stats",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("task_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("done_task_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "untagged_task_count", sa.Integer(), nullable=False, server_default="0"
+        ),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    # Same counts as app.commands.recompute_task_stats
+    op.execute(
+        """
+        INSERT INTO task_stats (
+            user_id, task_count, done_task_count, untagged_task_count
+        )
+        SELECT
+            user_id,
+            count(*),
+            sum(done),
+            sum(NOT EXISTS (
+                SELECT 1 FROM task_tag_links WHERE task_id = tasks.id
+            ))
+        FROM tasks
+        GROUP BY user_id
+        """
+    )
+
+    # A new task has no links yet, so it starts out untagged; the link
+    # triggers move it in and out of untagged_task_count afterwards.
+    op.execute(
+        """
+        CREATE TRIGGER task_stats_after_task_insert
+        AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_stats (
+                user_id, task_count, done_task_count, untagged_task_count
+            )
+            VALUES (new.user_id, 1, new.done, 1)
+            ON CONFLICT (user_id) DO UPDATE SET
+                task_count = task_count + 1,
+                done_task_count = done_task_count + excluded.done_task_count,
+                untagged_task_count = untagged_task_count + 1;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER task_stats_after_task_delete
+        AFTER DELETE ON tasks BEGIN
+            UPDATE task_stats SET
+                task_count = task_count - 1,
+                done_task_count = done_task_count - old.done,
+                untagged_task_count = untagged_task_count - NOT EXISTS (
+                    SELECT 1 FROM task_tag_links WHERE task_id = old.id
+                )
+            WHERE user_id = old.user_id;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER task_stats_after_task_done
+        AFTER UPDATE OF done ON tasks WHEN old.done IS NOT new.done BEGIN
+            UPDATE task_stats SET
+                done_task_count = done_task_count + new.done - old.done
+            WHERE user_id = new.user_id;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER task_stats_after_link_insert
+        AFTER INSERT ON task_tag_links
+        WHEN (SELECT count(*) FROM task_tag_links WHERE task_id = new.task_id) = 1
+        BEGIN
+            UPDATE task_stats SET untagged_task_count = untagged_task_count - 1
+            WHERE user_id = (SELECT user_id FROM tasks WHERE id = new.task_id);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER task_stats_after_link_delete
+        AFTER DELETE ON task_tag_links
+        WHEN NOT EXISTS (SELECT 1 FROM task_tag_links WHERE task_id = old.task_id)
+        BEGIN
+            UPDATE task_stats SET untagged_task_count = untagged_task_count + 1
+            WHERE user_id = (SELECT user_id FROM tasks WHERE id = old.task_id);
+        END
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER task_stats_after_link_delete")
+    op.execute("DROP TRIGGER task_stats_after_link_insert")
+    op.execute("DROP TRIGGER task_stats_after_task_done")
+    op.execute("DROP TRIGGER task_stats_after_task_delete")
+    op.execute("DROP TRIGGER task_stats_after_task_insert")
+    op.drop_table("task_stats")
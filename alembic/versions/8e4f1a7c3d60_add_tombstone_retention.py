@@ -0,0 +1,67 @@
+"""add tombstone retention
+
+Revision ID: 8e4f1a7c3d60
+Revises: 2d8c5e1a9f47
+Create Date: 2026-10-18 19:46:05.518390
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e4f1a7c3d60"
+down_revision: Union[str, None] = "2d8c5e1a9f47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+
+def create_tombstone_triggers(deleted_at: bool) -> None:
+    columns = "user_id, entity, entity_id, change_seq"
+    values = "old.user_id, '{entity}', old.id, data_version + 1"
+    if deleted_at:
+        columns += ", deleted_at"
+        values += f", {NOW}"
+    for table, entity in (("tasks", "task"), ("tags", "tag")):
+        op.execute(f"DROP TRIGGER sync_after_{entity}_delete")
+        op.execute(
+            f"""
+            CREATE TRIGGER sync_after_{entity}_delete
+            AFTER DELETE ON {table} BEGIN
+                INSERT INTO tombstones ({columns})
+                SELECT {values.format(entity=entity)}
+                FROM users WHERE users.id = old.user_id;
+            END
+            """
+        )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Not batch operations: rebuilding the tables would trip over the triggers
+    # that reference them
+    op.add_column(
+        "tombstones",
+        sa.Column("deleted_at", sa.Integer(), nullable=False, server_default="0"),
+    )
+    # The retention period of existing tombstones starts now
+    op.execute(f"UPDATE tombstones SET deleted_at = {NOW}")
+    op.add_column(
+        "users",
+        sa.Column(
+            "tombstones_pruned_seq", sa.Integer(), nullable=False, server_default="0"
+        ),
+    )
+    create_tombstone_triggers(deleted_at=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    create_tombstone_triggers(deleted_at=False)
+    op.drop_column("users", "tombstones_pruned_seq")
+    op.drop_column("tombstones", "deleted_at")
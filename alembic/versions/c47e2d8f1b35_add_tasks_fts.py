@@ -0,0 +1,70 @@
+"""add tasks fts
+
+Revision ID: c47e2d8f1b35
+Revises: 9d3b7c4e2a10
+Create Date: 2026-10-18 11:26:05.903417
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c47e2d8f1b35"
+down_revision: Union[str, None] = "9d3b7c4e2a10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # External-content FTS5 index over tasks(title, description), kept in sync
+    # by the triggers below.
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE tasks_fts USING fts5(
+            title,
+            description,
+            content='tasks',
+            content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    op.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+    op.execute(
+        """
+        CREATE TRIGGER tasks_fts_after_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_fts_after_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER tasks_fts_after_update
+        AFTER UPDATE OF title, description ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO tasks_fts(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER tasks_fts_after_update")
+    op.execute("DROP TRIGGER tasks_fts_after_delete")
+    op.execute("DROP TRIGGER tasks_fts_after_insert")
+    op.execute("DROP TABLE tasks_fts")
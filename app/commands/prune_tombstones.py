@@ -0,0 +1,88 @@
+"""
+Remove the tombstones older than ``sync.tombstone_retention_days``.
+
+Every task or tag delete leaves a tombstone for ``GET /sync``, so the table
+only grows; run this periodically (e.g. daily from cron). Each user's
+``tombstones_pruned_seq`` is raised to the newest tombstone removed, and
+``GET /sync`` answers 410 to the cursors that would have needed one: those
+clients start over with a full sync.
+
+Usage:
+    uv run python -m app.commands.prune_tombstones [--days 90] [--dry-run]
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import func
+from sqlmodel import col, delete, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.core.db import ShardedDatabase
+from app.internal.core.settings import get_settings
+from app.internal.models import Tombstone, User
+
+
+async def prune_tombstones(
+    session: AsyncSession, retention_days: float, dry_run: bool = False
+) -> int:
+    """Delete the tombstones older than ``retention_days`` and return how many."""
+    deleted_before = int(time.time() - retention_days * 24 * 60 * 60)
+    expired = col(Tombstone.deleted_at) < deleted_before
+
+    if dry_run:
+        count_result = await session.exec(
+            select(func.count()).select_from(Tombstone).where(expired)
+        )
+        return count_result.one()
+
+    result = await session.execute(
+        delete(Tombstone)
+        .where(expired)
+        .returning(col(Tombstone.user_id), col(Tombstone.change_seq))
+    )
+    rows = result.all()
+    pruned_seqs: dict[int, int] = {}
+    for user_id, change_seq in rows:
+        pruned_seqs[user_id] = max(pruned_seqs.get(user_id, 0), change_seq)
+    if pruned_seqs:
+        # Change sequences only grow, so the newest tombstone removed is past
+        # the previous runs'
+        await session.execute(
+            update(User),
+            params=[
+                {"id": user_id, "tombstones_pruned_seq": change_seq}
+                for user_id, change_seq in pruned_seqs.items()
+            ],
+        )
+    await session.commit()
+    return len(rows)
+
+
+async def main(retention_days: float, dry_run: bool) -> None:
+    database = ShardedDatabase(get_settings().database)
+    pruned = 0
+    try:
+        for shard in database.shards:
+            async with shard.write_session() as session:
+                pruned += await prune_tombstones(session, retention_days, dry_run)
+    finally:
+        await database.dispose()
+
+    print(f"{pruned} tombstone(s) {'to prune' if dry_run else 'pruned'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--days",
+        type=float,
+        help="Retention period, instead of sync.tombstone_retention_days",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only count the tombstones to prune"
+    )
+    args = parser.parse_args()
+    retention_days = args.days or get_settings().sync.tombstone_retention_days
+    asyncio.run(main(retention_days, args.dry_run))
@@ -0,0 +1,119 @@
+"""
+Rebuild the per-user task counters in ``task_stats`` from ``tasks``.
+
+``task_stats`` is kept up to date by database triggers; ``GET /tasks/stats``
+reads it instead of counting. This recomputes the counters of every user (or
+only one) whose row drifted or is missing, for after manual data fixes or to
+check for drift. The ``data_version`` of every user whose row changed is
+bumped in the same transaction, so that ETags and cached responses of the old
+stats go stale.
+
+Usage:
+    uv run python -m app.commands.recompute_task_stats [--user-id 1] [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import and_, exists, func, not_, or_
+from sqlmodel import col, insert, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.core.db import ShardedDatabase
+from app.internal.core.etag import bump_data_versions
+from app.internal.core.settings import get_settings
+from app.internal.models import Task, TaskStats, TaskTagLink
+
+task_count = (
+    select(func.count())
+    .select_from(Task)
+    .where(Task.user_id == TaskStats.user_id)
+    .scalar_subquery()
+)
+done_task_count = (
+    select(func.count())
+    .select_from(Task)
+    .where(Task.user_id == TaskStats.user_id, col(Task.done))
+    .scalar_subquery()
+)
+untagged_task_count = (
+    select(func.count())
+    .select_from(Task)
+    .where(
+        Task.user_id == TaskStats.user_id,
+        not_(exists().where(col(TaskTagLink.task_id) == Task.id)),
+    )
+    .scalar_subquery()
+)
+drifted = or_(
+    col(TaskStats.task_count) != task_count,
+    col(TaskStats.done_task_count) != done_task_count,
+    col(TaskStats.untagged_task_count) != untagged_task_count,
+)
+
+
+async def recompute_task_stats(
+    session: AsyncSession, user_id: int | None = None, dry_run: bool = False
+) -> int:
+    """Fix the counters that drifted and return how many users' were wrong."""
+    # Users with tasks but without a row
+    missing = (
+        select(Task.user_id)
+        .where(not_(exists().where(col(TaskStats.user_id) == Task.user_id)))
+        .distinct()
+    )
+    condition = drifted
+    if user_id is not None:
+        missing = missing.where(Task.user_id == user_id)
+        condition = and_(col(TaskStats.user_id) == user_id, drifted)
+
+    if dry_run:
+        missing_result = await session.exec(
+            select(func.count()).select_from(missing.subquery())
+        )
+        drifted_result = await session.exec(
+            select(func.count()).select_from(TaskStats).where(condition)
+        )
+        return missing_result.one() + drifted_result.one()
+
+    # Missing rows start at zero, so the UPDATE below counts them as drifted
+    await session.execute(insert(TaskStats).from_select(["user_id"], missing))
+    result = await session.execute(
+        update(TaskStats)
+        .where(condition)
+        .values(
+            task_count=task_count,
+            done_task_count=done_task_count,
+            untagged_task_count=untagged_task_count,
+        )
+        .returning(col(TaskStats.user_id))
+        .execution_options(synchronize_session=False)
+    )
+    user_ids = result.scalars().all()
+    await bump_data_versions(session, user_ids)
+    await session.commit()
+    return len(user_ids)
+
+
+async def main(user_id: int | None, dry_run: bool) -> None:
+    database = ShardedDatabase(get_settings().database)
+    shards = database.shards if user_id is None else [database.shard_for(user_id)]
+    fixed = 0
+    try:
+        for shard in shards:
+            async with shard.write_session() as session:
+                fixed += await recompute_task_stats(session, user_id, dry_run)
+    finally:
+        await database.dispose()
+
+    print(f"{fixed} user(s) {'with drifted stats' if dry_run else 'recomputed'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--user-id", type=int, help="Only this user's stats")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only count the drifted users"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id, args.dry_run))
@@ -0,0 +1,92 @@
+"""
+Rebuild the tag usage counters from ``task_tag_links``.
+
+``tags.task_count`` and ``tags.open_task_count`` are kept up to date by
+database triggers. This recomputes every counter (or only one user's) in a
+single UPDATE, for after manual data fixes or to check for drift. The
+``data_version`` of every user with a fixed tag is bumped in the same
+transaction, so that ETags and cached responses with the old counts go stale.
+
+Usage:
+    uv run python -m app.commands.reconcile_tag_counts [--user-id 1] [--dry-run]
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import and_, func, not_, or_
+from sqlmodel import col, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.core.db import ShardedDatabase
+from app.internal.core.etag import bump_data_versions
+from app.internal.core.settings import get_settings
+from app.internal.models import Tag, Task, TaskTagLink
+
+task_count = (
+    select(func.count())
+    .select_from(TaskTagLink)
+    .where(TaskTagLink.tag_id == Tag.id)
+    .scalar_subquery()
+)
+open_task_count = (
+    select(func.count())
+    .select_from(TaskTagLink)
+    .join(Task, col(Task.id) == TaskTagLink.task_id)
+    .where(TaskTagLink.tag_id == Tag.id, not_(col(Task.done)))
+    .scalar_subquery()
+)
+drifted = or_(
+    col(Tag.task_count) != task_count, col(Tag.open_task_count) != open_task_count
+)
+
+
+async def reconcile_tag_counts(
+    session: AsyncSession, user_id: int | None = None, dry_run: bool = False
+) -> int:
+    """Fix the counters that drifted and return how many tags were wrong."""
+    condition = (
+        drifted if user_id is None else and_(col(Tag.user_id) == user_id, drifted)
+    )
+    if dry_run:
+        drifted_count = await session.exec(
+            select(func.count()).select_from(Tag).where(condition)
+        )
+        return drifted_count.one()
+
+    result = await session.execute(
+        update(Tag)
+        .where(condition)
+        .values(task_count=task_count, open_task_count=open_task_count)
+        .returning(col(Tag.user_id))
+        .execution_options(synchronize_session=False)
+    )
+    # One user id per fixed tag
+    user_ids = result.scalars().all()
+    await bump_data_versions(session, user_ids)
+    await session.commit()
+    return len(user_ids)
+
+
+async def main(user_id: int | None, dry_run: bool) -> None:
+    database = ShardedDatabase(get_settings().database)
+    shards = database.shards if user_id is None else [database.shard_for(user_id)]
+    fixed = 0
+    try:
+        for shard in shards:
+            async with shard.write_session() as session:
+                fixed += await reconcile_tag_counts(session, user_id, dry_run)
+    finally:
+        await database.dispose()
+
+    print(f"{fixed} tag(s) {'with drifted counts' if dry_run else 'reconciled'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--user-id", type=int, help="Only this user's tags")
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Only count the drifted tags"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.user_id, args.dry_run))
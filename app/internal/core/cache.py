@@ -0,0 +1,180 @@
+"""
+In-process cache of rendered task and tag read responses.
+
+Entries are keyed by the response ETag (see ``etag.py``), which already holds
+the user id, the user's ``data_version`` and a digest of the path and query.
+A cached body can therefore never be served after a write, not even one made
+by another worker: the write bumps the version, so the next read looks up a
+different key. Writes still drop the user's entries right away
+(``invalidate_user``), so that dead versions don't take up space until they
+fall out of the LRU order or expire.
+
+The cache is bounded by entry count and by total body size, entries expire
+after ``ttl_seconds``, and hit/miss/eviction counters are kept for sizing.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Annotated, Any, Callable
+
+from fastapi import Depends, Response
+from starlette.requests import HTTPConnection
+
+from app.internal.core.settings import ReadCacheSettings
+
+
+@dataclass
+class CachedResponse:
+    user_id: int
+    body: bytes
+    headers: dict[str, str]
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def to_response(self) -> Response:
+        return Response(content=self.body, headers=self.headers)
+
+
+class ReadCache:
+    def __init__(
+        self,
+        settings: ReadCacheSettings,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.enabled = settings.enabled
+        self.max_entries = settings.max_entries
+        self.max_bytes = settings.max_bytes
+        self.ttl_seconds = settings.ttl_seconds
+        self._clock = clock
+        # Least recently used first
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._keys_by_user: dict[int, set[str]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Response | None:
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= self._clock():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.to_response()
+
+    def store(self, user_id: int | None, key: str, response: Response) -> Response:
+        """Cache a rendered response under ``key`` and return it unchanged."""
+        if not self.enabled or user_id is None or len(response.body) > self.max_bytes:
+            return response
+
+        if key in self._entries:
+            self._remove(key)
+        entry = CachedResponse(
+            user_id=user_id,
+            body=bytes(response.body),
+            headers=dict(response.headers),
+            expires_at=self._clock() + self.ttl_seconds,
+        )
+        self._entries[key] = entry
+        self._keys_by_user.setdefault(user_id, set()).add(key)
+        self._bytes += entry.size
+        self._evict()
+
+        return response
+
+    def invalidate_user(self, user_id: int | None) -> None:
+        """Drop every entry of the user; call on each write to their data."""
+        if user_id is None:
+            return
+        for key in self._keys_by_user.get(user_id, set()).copy():
+            self._remove(key)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_user.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+    def _evict(self) -> None:
+        now = self._clock()
+        # Expired entries at the cold end go first, then the least recently used
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if entry.expires_at <= now:
+                self.expirations += 1
+            elif len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self.evictions += 1
+            else:
+                break
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        keys = self._keys_by_user[entry.user_id]
+        keys.discard(key)
+        if not keys:
+            del self._keys_by_user[entry.user_id]
+
+
+def get_read_cache(connection: HTTPConnection) -> ReadCache:
+    # Created by the app's lifespan, see app.main.create_app
+    return connection.app.state.read_cache
+
+
+ReadCacheDep = Annotated[ReadCache, Depends(get_read_cache)]
+
+READ_CACHE_METRICS = {
+    "hits": ("counter", "Read cache lookups that returned a cached response"),
+    "misses": ("counter", "Read cache lookups that found nothing usable"),
+    "evictions": ("counter", "Entries evicted to stay within the size limits"),
+    "expirations": ("counter", "Entries dropped after their TTL"),
+    "invalidations": ("counter", "Entries dropped by writes to the user's data"),
+    "entries": ("gauge", "Entries currently cached"),
+    "bytes": ("gauge", "Total size of the cached response bodies"),
+}
+
+
+def collect_read_cache_metrics(read_cache: ReadCache) -> list[str]:
+    stats = read_cache.stats()
+    lines = []
+    for key, (kind, documentation) in READ_CACHE_METRICS.items():
+        name = f"read_cache_{key}_total" if kind == "counter" else f"read_cache_{key}"
+        lines += [
+            f"# HELP {name} {documentation}",
+            f"# TYPE {name} {kind}",
+            f"{name} {stats[key]}",
+        ]
+    return lines
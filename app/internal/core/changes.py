@@ -0,0 +1,163 @@
+"""
+In-process publish/subscribe of task and tag changes, behind ``GET /changes``.
+
+Routers publish an event (e.g. ``task.updated`` with the task ids) once the
+write has committed, and every open feed of that user receives it. Publishing
+never waits on a connection:
+
+* each feed buffers at most ``buffer_size`` events. A consumer that falls
+  further behind loses its buffered events and gets a single ``resync`` event
+  instead, which tells it to catch up with ``GET /sync``; further events are
+  dropped until it has read that one;
+* heartbeats come from one timer for the whole hub, not one per connection.
+  Every ``heartbeat_seconds`` it flags all feeds, so an idle connection costs
+  an ``asyncio.Event`` and an empty deque, with no timer or task of its own.
+
+The hub lives in one worker process and only sees the writes that worker
+handled. With several workers, clients should call ``GET /sync`` when they
+(re)connect and on ``resync``, as they would after missing events.
+"""
+
+import asyncio
+import contextvars
+from collections import deque
+from typing import Annotated, Any, AsyncIterator, Iterable
+
+from fastapi import Depends, HTTPException
+from starlette.requests import HTTPConnection
+
+from app.internal.core.metrics import CHANGE_FEED_CONNECTIONS, CHANGE_FEED_EVENTS
+from app.internal.core.settings import ChangeFeedSettings
+
+# (event name, data); None is a heartbeat
+Message = tuple[str, dict[str, Any]] | None
+
+RESYNC: Message = ("resync", {})
+
+
+class ChangeFeed:
+    """The events of one connection, read with ``async for``."""
+
+    def __init__(self, user_id: int, buffer_size: int):
+        self.user_id = user_id
+        self.buffer_size = buffer_size
+        self._events: deque[Message] = deque()
+        self._overflowed = False
+        self._heartbeat_due = False
+        self._closed = False
+        self._wakeup = asyncio.Event()
+
+    def push(self, message: Message) -> None:
+        if self._overflowed:
+            CHANGE_FEED_EVENTS.inc("dropped")
+            return
+        if len(self._events) >= self.buffer_size:
+            CHANGE_FEED_EVENTS.inc("dropped", amount=len(self._events) + 1)
+            self._events.clear()
+            self._events.append(RESYNC)
+            self._overflowed = True
+        else:
+            self._events.append(message)
+        self._wakeup.set()
+
+    def heartbeat(self) -> None:
+        self._heartbeat_due = True
+        self._wakeup.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._wakeup.set()
+
+    async def __aiter__(self) -> AsyncIterator[Message]:
+        while not self._closed:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+
+            while self._events and not self._closed:
+                message = self._events.popleft()
+                if message is RESYNC:
+                    self._overflowed = False
+                CHANGE_FEED_EVENTS.inc("delivered")
+                yield message
+            if self._heartbeat_due and not self._closed:
+                self._heartbeat_due = False
+                yield None
+
+
+class ChangeHub:
+    def __init__(self, settings: ChangeFeedSettings):
+        self.buffer_size = settings.buffer_size
+        self.heartbeat_seconds = settings.heartbeat_seconds
+        self.max_feeds_per_user = settings.max_connections_per_user
+        self._feeds: dict[int, set[ChangeFeed]] = {}
+        self._heartbeats: asyncio.Task | None = None
+
+    @property
+    def connections(self) -> int:
+        return sum(len(feeds) for feeds in self._feeds.values())
+
+    def subscribe(self, user_id: int) -> ChangeFeed:
+        feeds = self._feeds.setdefault(user_id, set())
+        if len(feeds) >= self.max_feeds_per_user:
+            raise HTTPException(status_code=429, detail="Too many open change feeds")
+
+        feed = ChangeFeed(user_id, self.buffer_size)
+        feeds.add(feed)
+        CHANGE_FEED_CONNECTIONS.inc()
+        if self._heartbeats is None:
+            # Not in the request's context: the timer outlives the request
+            self._heartbeats = asyncio.create_task(
+                self._send_heartbeats(), context=contextvars.Context()
+            )
+        return feed
+
+    def unsubscribe(self, feed: ChangeFeed) -> None:
+        feeds = self._feeds.get(feed.user_id, set())
+        if feed in feeds:
+            feeds.remove(feed)
+            CHANGE_FEED_CONNECTIONS.dec()
+        if not feeds:
+            self._feeds.pop(feed.user_id, None)
+
+    def publish(
+        self, user_id: int | None, event: str, ids: Iterable[int | None]
+    ) -> None:
+        """Notify the user's feeds; call once the write has been committed."""
+        if user_id is None or user_id not in self._feeds:
+            return
+        message: Message = (
+            event,
+            {"ids": [row_id for row_id in ids if row_id is not None]},
+        )
+        for feed in self._feeds[user_id]:
+            feed.push(message)
+
+    async def _send_heartbeats(self) -> None:
+        try:
+            while self._feeds:
+                await asyncio.sleep(self.heartbeat_seconds)
+                for feeds in self._feeds.values():
+                    for feed in feeds:
+                        feed.heartbeat()
+        finally:
+            self._heartbeats = None
+
+    async def close(self) -> None:
+        """End every open feed."""
+        for feeds in self._feeds.values():
+            for feed in feeds:
+                feed.close()
+        if self._heartbeats is not None:
+            self._heartbeats.cancel()
+            try:
+                await self._heartbeats
+            except asyncio.CancelledError:
+                pass
+
+
+def get_change_hub(connection: HTTPConnection) -> ChangeHub:
+    # Created and closed by the app's lifespan, see app.main.create_app
+    return connection.app.state.change_hub
+
+
+ChangeHubDep = Annotated[ChangeHub, Depends(get_change_hub)]
@@ -1,30 +1,216 @@
-from typing import Annotated, AsyncGenerator
+from typing import Annotated, Any, AsyncGenerator, Sequence
 
-from fastapi import Depends
-from sqlalchemy.ext.asyncio import create_async_engine
-from sqlmodel import create_engine  # Keep for Alembic if needed
+from fastapi import Depends, Request
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlmodel import SQLModel, insert
 from sqlmodel.ext.asyncio.session import AsyncSession
+from starlette.requests import HTTPConnection
 
-from app.internal.core.settings import get_settings
+from app.internal.core.group_commit import GroupCommitter
+from app.internal.core.metrics import TimedQueuePool, instrument_engine
+from app.internal.core.settings import (
+    DatabaseSettings,
+    GroupCommitSettings,
+    SqliteSettings,
+)
+from app.internal.models.user import User
 
-settings = get_settings()
+READ_METHODS = frozenset({"GET", "HEAD"})
 
-# Use a different URL for async, note aiosqlite driver
-async_sqlite_url = f"sqlite+aiosqlite:///{settings.database.sqlite.file_name}"
 
-# The connect_args are specific to aiosqlite and other async drivers
-# For aiosqlite, check_same_thread is not needed as it's handled differently.
-async_engine = create_async_engine(async_sqlite_url)
+class SqliteDatabase:
+    """
+    Reader pool and single writer for one SQLite database file.
 
-# Synchronous engine for Alembic (if it doesn't support async directly)
-# or for specific synchronous tasks if any.
-sync_sqlite_url = f"sqlite:///{settings.database.sqlite.file_name}"
-sync_engine = create_engine(sync_sqlite_url, connect_args={"check_same_thread": False})
+    Every connection gets the pragmas from ``SqliteSettings``. Readers are
+    ``query_only`` connections in a pool of ``reader_pool_size``; in WAL mode
+    they read a consistent snapshot and never wait on the writer. All writes
+    go through one connection: its pool has a single slot, so concurrent
+    writers wait their turn in the pool's async queue (up to
+    ``writer_queue_timeout``) instead of failing with "database is locked".
+    The writer starts its transactions with ``BEGIN IMMEDIATE`` so that other
+    processes wait on ``busy_timeout`` rather than dead-locking on a lock
+    upgrade.
+    """
 
+    def __init__(
+        self,
+        sqlite: SqliteSettings,
+        group_commit: GroupCommitSettings = GroupCommitSettings(),
+        name: str = "",
+    ):
+        self.settings = sqlite
+        # Prefixes the engine names in metrics, e.g. "shard0.writer"
+        prefix = f"{name}." if name else ""
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSession(async_engine) as session:
+        # Use a different URL for async, note aiosqlite driver
+        url = f"sqlite+aiosqlite:///{sqlite.file_name}"
+
+        self.writer: AsyncEngine = create_async_engine(
+            url,
+            poolclass=TimedQueuePool,
+            pool_logging_name=f"{prefix}writer",
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=sqlite.writer_queue_timeout,
+        )
+        self.reader: AsyncEngine = create_async_engine(
+            url,
+            poolclass=TimedQueuePool,
+            pool_logging_name=f"{prefix}reader",
+            pool_size=sqlite.reader_pool_size,
+            max_overflow=0,
+        )
+
+        event.listen(self.writer.sync_engine, "connect", self._on_writer_connect)
+        event.listen(self.writer.sync_engine, "begin", self._on_writer_begin)
+        event.listen(self.reader.sync_engine, "connect", self._on_reader_connect)
+        instrument_engine(self.writer, f"{prefix}writer")
+        instrument_engine(self.reader, f"{prefix}reader")
+        self.writes = GroupCommitter(
+            self.write_session, group_commit, f"{prefix}writer"
+        )
+
+    def _apply_pragmas(self, dbapi_connection, *pragmas: str) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in (
+                f"journal_mode = {self.settings.journal_mode}",
+                f"synchronous = {self.settings.synchronous}",
+                f"cache_size = {self.settings.cache_size}",
+                f"mmap_size = {self.settings.mmap_size}",
+                f"busy_timeout = {self.settings.busy_timeout}",
+                *pragmas,
+            ):
+                cursor.execute(f"PRAGMA {pragma}")
+        finally:
+            cursor.close()
+
+    def _on_writer_connect(self, dbapi_connection, connection_record) -> None:
+        self._apply_pragmas(dbapi_connection)
+        # Let the "begin" event below emit BEGIN instead of the driver
+        dbapi_connection.isolation_level = None
+
+    def _on_writer_begin(self, connection) -> None:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    def _on_reader_connect(self, dbapi_connection, connection_record) -> None:
+        self._apply_pragmas(dbapi_connection, "query_only = ON")
+
+    # Objects stay loaded after commit: re-loading them (and lazy loading their
+    # relationships) would cost extra round trips and fails outside a greenlet.
+    def read_session(self) -> AsyncSession:
+        return AsyncSession(self.reader, expire_on_commit=False)
+
+    def write_session(self) -> AsyncSession:
+        return AsyncSession(self.writer, expire_on_commit=False)
+
+    async def dispose(self) -> None:
+        await self.writes.close()
+        await self.writer.dispose()
+        await self.reader.dispose()
+
+
+class ShardedDatabase:
+    """
+    The directory database holding ``users``, and the shards holding tasks and
+    tags.
+
+    With ``database.shards`` at 0 the directory is also the only shard.
+    Otherwise the data of user ``id`` lives in shard ``id % shards``, so writes
+    of users on different shards don't queue for the same writer. Every file
+    has the full schema: a shard keeps a copy of its users' rows (without the
+    password, see ``create_shard_user``) for the foreign keys and
+    ``User.data_version``, which is bumped in the same transaction as the
+    writes it tracks. Task and tag ids are only unique within a shard.
+    """
+
+    def __init__(self, settings: DatabaseSettings):
+        self.directory = SqliteDatabase(settings.sqlite, settings.group_commit)
+        self.shards = [
+            SqliteDatabase(
+                settings.sqlite.model_copy(update={"file_name": file_name}),
+                settings.group_commit,
+                name=f"shard{index}",
+            )
+            for index, file_name in enumerate(settings.shard_file_names())
+        ] or [self.directory]
+
+    @property
+    def sharded(self) -> bool:
+        return self.shards[0] is not self.directory
+
+    def shard_for(self, user_id: int | None) -> SqliteDatabase:
+        return self.shards[(user_id or 0) % len(self.shards)]
+
+    def databases(self) -> list[SqliteDatabase]:
+        return [self.directory, *self.shards] if self.sharded else [self.directory]
+
+    async def create_shard_user(self, user: User) -> None:
+        """Copy a new user's row to its shard; call after committing it."""
+        if not self.sharded:
+            return
+        async with self.shard_for(user.id).write_session() as session:
+            session.add(User(id=user.id, username=user.username, password=""))
+            await session.commit()
+
+    async def dispose(self) -> None:
+        for database in self.databases():
+            await database.dispose()
+
+
+def get_database(connection: HTTPConnection) -> ShardedDatabase:
+    # Created and disposed of by the app's lifespan, see app.main.create_app
+    return connection.app.state.database
+
+
+DatabaseDep = Annotated[ShardedDatabase, Depends(get_database)]
+
+
+# Sessions on the directory database (users). The sessions on the current
+# user's shard (tasks and tags) are in app.internal.core.sessions.
+async def get_directory_read_session(
+    database: DatabaseDep,
+) -> AsyncGenerator[AsyncSession, None]:
+    async with database.directory.read_session() as session:
+        yield session
+
+
+DirectoryReadSessionDep = Annotated[AsyncSession, Depends(get_directory_read_session)]
+
+
+async def get_directory_session(
+    request: Request,
+    database: DatabaseDep,
+    read_session: DirectoryReadSessionDep,
+) -> AsyncGenerator[AsyncSession, None]:
+    # Sessions only check out a connection on first use, so the unused read
+    # session of a write request costs nothing.
+    if request.method in READ_METHODS:
+        yield read_session
+        return
+
+    async with database.directory.write_session() as session:
         yield session
 
 
-SessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+DirectorySessionDep = Annotated[AsyncSession, Depends(get_directory_session)]
+
+
+async def insert_returning_ids(
+    session: AsyncSession,
+    model: type[SQLModel],
+    rows: Sequence[dict[str, Any]],
+) -> list[int]:
+    """
+    Insert rows with one multi-row INSERT and return their ids in row order.
+
+    ``returning(..., sort_by_parameter_order=True)`` makes SQLAlchemy fall back
+    to one statement per row on SQLite. Rows of a single INSERT get increasing
+    rowids instead, so sorting the returned ids restores the parameter order.
+    """
+    result = await session.execute(
+        insert(model).returning(getattr(model, "id")), params=list(rows)
+    )
+    return sorted(result.scalars().all())
@@ -0,0 +1,94 @@
+"""
+Conditional GET support based on a per-user change version.
+
+Every write to a user's tasks or tags bumps ``User.data_version`` in the same
+transaction. Read routes derive a strong ETag from that version and the
+request URL, and answer a matching ``If-None-Match`` with 304 before running
+their query.
+"""
+
+import hashlib
+from typing import Annotated, Iterable
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlmodel import col, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.core.cache import ReadCache
+from app.internal.core.security import CurrentUserDep
+from app.internal.core.sessions import ReadSessionDep
+from app.internal.models.user import User
+
+CACHE_CONTROL = "private, no-cache"
+
+
+async def bump_data_version(
+    session: AsyncSession, user_id: int | None, read_cache: ReadCache
+) -> None:
+    """Mark the user's data as changed; call before committing a write."""
+    # Pending changes first: the sync triggers stamp rows with the version
+    # this update is about to commit
+    await session.flush()
+    await session.execute(
+        update(User)
+        .where(col(User.id) == user_id)
+        .values(data_version=col(User.data_version) + 1)
+    )
+    read_cache.invalidate_user(user_id)
+
+
+async def bump_data_versions(session: AsyncSession, user_ids: Iterable[int]) -> None:
+    """
+    Mark several users' data as changed, for maintenance commands that fix
+    data outside of a request. Cached responses of any worker are keyed by
+    the version, so they are not served again after the commit.
+    """
+    user_ids = set(user_ids)
+    if user_ids:
+        await session.execute(
+            update(User)
+            .where(col(User.id).in_(user_ids))
+            .values(data_version=col(User.data_version) + 1)
+        )
+
+
+def make_etag(user_id: int | None, data_version: int, request: Request) -> str:
+    # The representation also depends on the path and query (page, filters)
+    url_digest = hashlib.blake2b(
+        f"{request.url.path}?{request.url.query}".encode(), digest_size=8
+    ).hexdigest()
+    return f'"{user_id}.{data_version}.{url_digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+async def check_etag(
+    request: Request,
+    response: Response,
+    current_user: CurrentUserDep,
+    session: ReadSessionDep,
+) -> str:
+    result = await session.exec(
+        select(User.data_version).where(col(User.id) == current_user.id)
+    )
+    etag = make_etag(current_user.id, result.first() or 0, request)
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        raise HTTPException(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return etag
+
+
+ETagDep = Annotated[str, Depends(check_etag)]
@@ -0,0 +1,144 @@
+"""
+Sparse fieldsets for the task read endpoints.
+
+``?fields=title,done`` selects only those columns (plus ``id``, which is
+always returned) and ``?include=tags`` loads the tags. Without either
+parameter a task is returned in full, tags included, as before. As soon as
+one of them is given, tags are only loaded when ``include=tags`` asks for
+them, so ``?fields=title,done`` never queries ``task_tag_links``.
+
+Each combination gets a response model generated from ``TaskPublic``, used to
+validate the partial tasks when ``api.fast_json`` is off.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+from types import GenericAlias
+from typing import Annotated, Any
+
+from fastapi import Depends, HTTPException, Query, Response
+from pydantic import BaseModel, TypeAdapter, create_model
+from sqlalchemy import Select
+from sqlalchemy import select as select_rows
+from sqlmodel import col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.core.serialization import FastJSONResponse
+from app.internal.core.tagging import get_tags_by_task
+from app.internal.models.task import Task, TaskPublic
+
+# Selectable task columns, in the order of TaskPublic
+TASK_FIELDS = ("title", "description", "done", "id")
+TASK_INCLUDES = ("tags",)
+
+
+@lru_cache
+def task_fieldset_model(fields: tuple[str, ...], include_tags: bool) -> type[BaseModel]:
+    """Generate the public model of tasks restricted to ``fields``."""
+    definitions: dict[str, Any] = {
+        name: (info.annotation, info)
+        for name, info in TaskPublic.model_fields.items()
+        if name in fields or (name == "tags" and include_tags)
+    }
+    suffix = "".join(name.title() for name in fields)
+    if include_tags:
+        suffix += "Tags"
+    return create_model(f"TaskPublic{suffix}", **definitions)
+
+
+@lru_cache
+def task_fieldset_list_adapter(
+    fields: tuple[str, ...], include_tags: bool
+) -> TypeAdapter:
+    # list[model], spelled out since the model is only known at runtime
+    return TypeAdapter(GenericAlias(list, (task_fieldset_model(fields, include_tags),)))
+
+
+@dataclass(frozen=True)
+class TaskFieldset:
+    fields: tuple[str, ...] = TASK_FIELDS
+    include_tags: bool = True
+
+    @property
+    def complete(self) -> bool:
+        return self.include_tags and self.fields == TASK_FIELDS
+
+    def select(self) -> Select:
+        # Not sqlmodel's select, which turns a single column (``fields=id``)
+        # into scalars
+        return select_rows(*(col(getattr(Task, name)) for name in self.fields))
+
+    async def load(
+        self, session: AsyncSession, statement: Select
+    ) -> list[dict[str, Any]]:
+        """Run ``statement`` (built from ``select()``) and return the tasks."""
+        result = await session.execute(statement)
+        tasks = [dict(row) for row in result.mappings().all()]
+        if self.include_tags and tasks:
+            tags = await get_tags_by_task(session, [task["id"] for task in tasks])
+            for task in tasks:
+                task["tags"] = tags.get(task["id"], [])
+        return tasks
+
+    def render(
+        self,
+        content: list[dict[str, Any]] | dict[str, Any],
+        response: Response,
+        fast_json: bool,
+    ) -> Response:
+        """
+        Render a partial task or list of tasks, keeping the headers set on the
+        injected response. Without ``fast_json`` they are validated against
+        the generated model first.
+        """
+        if fast_json:
+            return FastJSONResponse(content, headers=response.headers)
+
+        if isinstance(content, dict):
+            model = task_fieldset_model(self.fields, self.include_tags)
+            body = model.model_validate(content).model_dump_json().encode()
+        else:
+            adapter = task_fieldset_list_adapter(self.fields, self.include_tags)
+            body = adapter.dump_json(adapter.validate_python(content))
+        return Response(
+            content=body, media_type="application/json", headers=response.headers
+        )
+
+
+def parse_names(value: str, allowed: tuple[str, ...], kind: str) -> set[str]:
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    if unknown := names.difference(allowed):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {kind}: {', '.join(sorted(unknown))}",
+        )
+    return names
+
+
+def get_task_fieldset(
+    fields: Annotated[
+        str | None,
+        Query(
+            description="Comma-separated task fields to return "
+            f"({', '.join(TASK_FIELDS)}); id is always returned",
+        ),
+    ] = None,
+    include: Annotated[
+        str | None,
+        Query(description="Comma-separated relationships to load (tags)"),
+    ] = None,
+) -> TaskFieldset:
+    if fields is None and include is None:
+        return TaskFieldset()
+
+    selected = set(TASK_FIELDS)
+    if fields is not None:
+        selected = parse_names(fields, TASK_FIELDS, "field") | {"id"}
+    included = parse_names(include, TASK_INCLUDES, "include") if include else set()
+    return TaskFieldset(
+        fields=tuple(name for name in TASK_FIELDS if name in selected),
+        include_tags="tags" in included,
+    )
+
+
+TaskFieldsetDep = Annotated[TaskFieldset, Depends(get_task_fieldset)]
@@ -0,0 +1,157 @@
+"""
+Group commit for single-task writes (create, update and delete).
+
+Each of those requests otherwise runs its own transaction, so one COMMIT (and,
+with ``synchronous = full``, one fsync) per request. With
+``database.group_commit.enabled``, ``GroupCommitter.run`` queues the write
+instead. The first write of a group waits up to ``window_ms`` for others (or
+until ``max_ops`` are queued), then the whole group runs in one transaction
+on the writer connection:
+
+* each write runs in its own SAVEPOINT, so a failing one (e.g. a 404) is
+  rolled back alone and only its request gets the error;
+* results are handed back only once the COMMIT returned, so no response is
+  sent for data that isn't durable yet. If the COMMIT fails, every write of
+  the group gets the error.
+
+Writes run in a copy of the context of the request that queued them, so
+profiling attributes their statements to the right request.
+"""
+
+import asyncio
+import contextvars
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Coroutine, TypeVar
+
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.core.metrics import DB_GROUP_COMMIT_SIZE
+from app.internal.core.settings import GroupCommitSettings
+
+T = TypeVar("T")
+
+
+@dataclass
+class _QueuedWrite:
+    write: Callable[[AsyncSession], Coroutine[Any, Any, Any]]
+    future: asyncio.Future
+    context: contextvars.Context
+
+
+class GroupCommitter:
+    """Runs writes on one database, committed in groups when enabled."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        settings: GroupCommitSettings,
+        name: str,
+    ):
+        self.session_factory = session_factory
+        self.enabled = settings.enabled
+        self.window = settings.window_ms / 1000
+        self.max_ops = settings.max_ops
+        self.name = name
+        self._queue: list[_QueuedWrite] = []
+        self._first_queued_at = 0.0
+        self._full = asyncio.Event()
+        self._flusher: asyncio.Task | None = None
+
+    async def run(self, write: Callable[[AsyncSession], Coroutine[Any, Any, T]]) -> T:
+        """
+        Run ``write`` in a write transaction and return its result once it is
+        committed. ``write`` must not commit or roll back the session itself.
+        """
+        if not self.enabled:
+            async with self.session_factory() as session:
+                result = await write(session)
+                await session.commit()
+                return result
+
+        if not self._queue:
+            self._first_queued_at = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append(_QueuedWrite(write, future, contextvars.copy_context()))
+        if len(self._queue) >= self.max_ops:
+            self._full.set()
+        if self._flusher is None:
+            # Not in the request's context: the flusher outlives the request
+            self._flusher = asyncio.create_task(
+                self._flush(), context=contextvars.Context()
+            )
+        return await future
+
+    async def _flush(self) -> None:
+        try:
+            while self._queue:
+                delay = self._first_queued_at + self.window - time.perf_counter()
+                if delay > 0 and len(self._queue) < self.max_ops:
+                    self._full.clear()
+                    try:
+                        await asyncio.wait_for(self._full.wait(), delay)
+                    except TimeoutError:
+                        pass
+
+                # Writes queued meanwhile have waited already: the next group
+                # starts right after this one
+                group = self._queue[: self.max_ops]
+                del self._queue[: self.max_ops]
+                await self._commit(group)
+        finally:
+            self._flusher = None
+
+    async def _commit(self, group: list[_QueuedWrite]) -> None:
+        DB_GROUP_COMMIT_SIZE.observe(len(group), self.name)
+        # A write alone in its group is rolled back with the whole transaction
+        savepoints = len(group) > 1
+        succeeded: list[tuple[_QueuedWrite, Any]] = []
+        try:
+            async with self.session_factory() as session:
+                for queued in group:
+                    if queued.future.cancelled():
+                        continue
+                    try:
+                        result = await self._run_write(session, queued, savepoints)
+                    except Exception as exc:
+                        if not savepoints:
+                            raise
+                        if not queued.future.done():
+                            queued.future.set_exception(exc)
+                    else:
+                        succeeded.append((queued, result))
+
+                if succeeded:
+                    await session.commit()
+        except BaseException as exc:
+            for queued in group:
+                if queued.future.done():
+                    continue
+                if isinstance(exc, Exception):
+                    queued.future.set_exception(exc)
+                else:
+                    queued.future.cancel()
+            if not isinstance(exc, Exception):
+                raise
+            return
+
+        for queued, result in succeeded:
+            if not queued.future.done():
+                queued.future.set_result(result)
+
+    async def _run_write(
+        self, session: AsyncSession, queued: _QueuedWrite, savepoint: bool
+    ) -> Any:
+        if not savepoint:
+            return await self._in_context(session, queued)
+        async with session.begin_nested():
+            return await self._in_context(session, queued)
+
+    @staticmethod
+    def _in_context(session: AsyncSession, queued: _QueuedWrite) -> asyncio.Task:
+        return asyncio.create_task(queued.write(session), context=queued.context)
+
+    async def close(self) -> None:
+        """Wait for the queued writes to be committed."""
+        if self._flusher is not None:
+            await self._flusher
@@ -0,0 +1,114 @@
+"""
+Password hashing off the event loop.
+
+bcrypt is deliberately slow, so hashing and verification run in a thread or
+process pool sized from ``PasswordHashingSettings``. The number of operations
+in flight is bounded; once the pool and its queue are full, new operations are
+rejected with a 503 instead of piling up behind a login burst.
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Annotated
+
+from fastapi import Depends, HTTPException
+from passlib.context import CryptContext
+from starlette.requests import HTTPConnection
+
+from app.internal.core.metrics import (
+    PASSWORD_HASHING_DURATION,
+    PASSWORD_HASHING_WAIT,
+)
+from app.internal.core.settings import PasswordHashingSettings
+
+
+@lru_cache
+def _crypt_context(rounds: int) -> CryptContext:
+    # Hashes created with a different cost are reported as needing an update
+    return CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=rounds)
+
+
+# Module-level functions so they can be pickled for a process pool
+def _hash(password: str, rounds: int) -> str:
+    return _crypt_context(rounds).hash(password)
+
+
+def _verify_and_update(
+    password: str, hashed_password: str, rounds: int
+) -> tuple[bool, str | None]:
+    return _crypt_context(rounds).verify_and_update(password, hashed_password)
+
+
+def _timed(fn, *args):
+    # Timed in the worker, so queueing for a free worker isn't counted
+    started = time.perf_counter()
+    return fn(*args), time.perf_counter() - started
+
+
+class PasswordHasher:
+    def __init__(self, settings: PasswordHashingSettings):
+        self.rounds = settings.bcrypt_rounds
+        self.capacity = settings.max_workers + settings.max_pending
+        self.in_flight = 0
+
+        self._executor: Executor
+        if settings.executor == "process":
+            self._executor = ProcessPoolExecutor(max_workers=settings.max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=settings.max_workers, thread_name_prefix="bcrypt"
+            )
+
+    async def _run(self, operation: str, fn, *args):
+        # The counter is only touched from the event loop thread, so no lock
+        if self.in_flight >= self.capacity:
+            raise HTTPException(
+                status_code=503,
+                detail="Too many password operations in progress",
+                headers={"Retry-After": "1"},
+            )
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            submitted = time.perf_counter()
+            result, elapsed = await loop.run_in_executor(
+                self._executor, _timed, fn, *args
+            )
+            PASSWORD_HASHING_DURATION.observe(elapsed, operation)
+            PASSWORD_HASHING_WAIT.observe(
+                time.perf_counter() - submitted - elapsed, operation
+            )
+            return result
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", _hash, password, self.rounds)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        """
+        Verify a password against its hash.
+
+        Returns:
+            A ``(valid, new_hash)`` tuple where ``new_hash`` is set when the
+            stored hash uses an outdated bcrypt cost and should be replaced.
+        """
+        return await self._run(
+            "verify", _verify_and_update, password, hashed_password, self.rounds
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_password_hasher(connection: HTTPConnection) -> PasswordHasher:
+    # Created and shut down by the app's lifespan, see app.main.create_app
+    return connection.app.state.password_hasher
+
+
+PasswordHasherDep = Annotated[PasswordHasher, Depends(get_password_hasher)]
@@ -0,0 +1,300 @@
+"""
+Prometheus metrics, rendered in the text exposition format on ``/metrics``.
+
+Instrumentation runs on the hot path of every request and query, so it is
+kept to plain dict lookups and integer/float increments:
+
+* every update happens on the event loop thread (route handlers, SQLAlchemy
+  events fire in the greenlet driving the query, password hashing timings are
+  recorded after the executor returns), so no locks are needed;
+* a histogram series is a preallocated list of bucket counts; an observation
+  is one ``bisect`` and two additions, cumulative counts are only built when
+  ``/metrics`` is scraped;
+* series are keyed by tuples of label values that already exist (the route
+  template, the HTTP method, the engine name).
+"""
+
+import logging
+import time
+from bisect import bisect_left
+from typing import Callable, Iterable, Sequence
+
+from fastapi import HTTPException, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# In seconds; from sub-millisecond SQLite queries to slow bcrypt logins
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        REGISTRY.register(self)
+
+    def header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+
+    def render(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {value}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+
+class _Series:
+    __slots__ = ("counts", "sum")
+
+    def __init__(self, size: int):
+        # One slot per bucket plus the +Inf overflow, not cumulative
+        self.counts = [0] * size
+        self.sum = 0.0
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, ...], _Series] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = _Series(len(self.buckets) + 1)
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        bounds = [*(repr(bound) for bound in self.buckets), "+Inf"]
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(bounds, series.counts):
+                cumulative += count
+                label_text = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{label_text} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {series.sum}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        lines = [line for metric in self._metrics for line in metric.render()]
+        lines.extend(extra)
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests handled, by route template and status code",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time spent in the route handler, including dependencies and serialization",
+    ("method", "route"),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled",
+    ("method", "route"),
+)
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Time spent executing SQL statements (the count is the number of queries)",
+    ("engine", "operation"),
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total", "SQL statements that raised an error", ("engine",)
+)
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    ("engine",),
+)
+DB_GROUP_COMMIT_SIZE = Histogram(
+    "db_group_commit_size",
+    "Writes committed together by group commit",
+    ("engine",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+PASSWORD_HASHING_DURATION = Histogram(
+    "password_hashing_duration_seconds",
+    "Time spent in bcrypt, by operation",
+    ("operation",),
+)
+PASSWORD_HASHING_WAIT = Histogram(
+    "password_hashing_wait_seconds",
+    "Time password operations waited for a free hashing worker",
+    ("operation",),
+)
+CHANGE_FEED_CONNECTIONS = Gauge(
+    "change_feed_connections", "Open GET /changes connections on this worker"
+)
+CHANGE_FEED_EVENTS = Counter(
+    "change_feed_events_total",
+    "Change feed events delivered to a connection, or dropped because its "
+    "buffer was full",
+    ("outcome",),
+)
+
+
+class MetricsRoute(APIRoute):
+    """Route class recording latency, status and in-flight requests per route."""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        route = self.path
+
+        async def timed_handler(request: Request) -> Response:
+            labels = (request.method, route)
+            HTTP_REQUESTS_IN_FLIGHT.inc(*labels)
+            started = time.perf_counter()
+            status = 500
+            try:
+                response = await handler(request)
+                status = response.status_code
+                return response
+            except HTTPException as exc:
+                status = exc.status_code
+                raise
+            except RequestValidationError:
+                status = 422
+                raise
+            finally:
+                HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, *labels)
+                HTTP_REQUESTS_IN_FLIGHT.dec(*labels)
+                HTTP_REQUESTS.inc(*labels, str(status))
+
+        return timed_handler
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool recording how long each checkout waited for a connection.
+
+    The engine name is taken from ``pool_logging_name``, which survives the
+    pool being recreated on ``dispose()``.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(
+                time.perf_counter() - started, self._orig_logging_name or "default"
+            )
+
+
+# SQLAlchemy names pool loggers after the pool class, which moves this one out
+# of the "sqlalchemy" logger (kept at WARNING) into the app's INFO logging
+logging.getLogger(f"{__name__}.{TimedQueuePool.__name__}").setLevel(logging.WARNING)
+
+
+SQL_OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """Record the count and latency of every statement run by the engine."""
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if context is not None:
+            context._metrics_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        started = getattr(context, "_metrics_started", None)
+        if started is None:
+            return
+        operation = statement.lstrip()[:6].upper()
+        if operation not in SQL_OPERATIONS:
+            operation = "OTHER"
+        DB_QUERY_DURATION.observe(time.perf_counter() - started, name, operation)
+
+    def handle_error(exception_context):
+        DB_QUERY_ERRORS.inc(name)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
+
+
+def render_metrics(extra: Iterable[str] = ()) -> Response:
+    """``extra`` holds lines for values kept by the app (e.g. cache stats)."""
+    return Response(content=REGISTRY.render(extra), media_type=CONTENT_TYPE)
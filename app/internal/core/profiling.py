@@ -0,0 +1,283 @@
+"""
+Opt-in per-request profiling (``profiling.enabled``), for development and
+troubleshooting rather than normal production traffic.
+
+``ProfilingMiddleware`` records every SQL statement a request issues (through
+engine events, attributed to the request with a context variable) with its
+duration, and groups them by shape: the statement text with whitespace and
+expanded ``IN (?, ?, ...)`` lists collapsed. A SELECT shape repeated
+``n_plus_one_threshold`` times or more within one request is logged as a
+likely N+1 (typically a lazy-loaded relationship such as ``Task.tags``).
+Requests slower than ``slow_request_ms`` get a compact report of their
+queries logged.
+
+With ``cpu_profile`` on, a background thread also samples the event loop
+thread's stack every ``sample_interval_ms``. Samples are attributed to a
+request when its task's outermost coroutine frame is on the stack, so
+concurrent requests don't mix. The ``max_dumps`` slowest requests above the
+threshold are written to ``dump_dir`` as collapsed stacks (``.folded``,
+readable by flamegraph.pl and speedscope).
+"""
+
+import asyncio
+import heapq
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import FrameType
+
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.internal.core.settings import ProfilingSettings
+
+logger = logging.getLogger(__name__)
+
+IN_LIST_PATTERN = re.compile(r"\?(?:\s*,\s*\?)+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+# Report at most this many statement shapes per slow request
+REPORT_SHAPES = 5
+
+
+def statement_shape(statement: str) -> str:
+    statement = WHITESPACE_PATTERN.sub(" ", statement).strip()
+    return IN_LIST_PATTERN.sub("?, ...", statement)
+
+
+@dataclass
+class RequestProfile:
+    method: str
+    path: str
+    thread_id: int
+    root_frame: FrameType | None
+    started: float = field(default_factory=time.perf_counter)
+    # (shape, seconds) of every statement, in execution order
+    statements: list[tuple[str, float]] = field(default_factory=list)
+    stacks: Counter[str] = field(default_factory=Counter)
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.statements.append((statement_shape(statement), seconds))
+
+    def shapes(self) -> list[tuple[str, int, float]]:
+        """``(shape, count, total seconds)``, most time first."""
+        counts: Counter[str] = Counter()
+        totals: defaultdict[str, float] = defaultdict(float)
+        for shape, seconds in self.statements:
+            counts[shape] += 1
+            totals[shape] += seconds
+        return sorted(
+            ((shape, counts[shape], totals[shape]) for shape in counts),
+            key=lambda item: item[2],
+            reverse=True,
+        )
+
+    def n_plus_one(self, threshold: int) -> list[tuple[str, int, float]]:
+        return [
+            (shape, count, seconds)
+            for shape, count, seconds in self.shapes()
+            if count >= threshold and shape.startswith("SELECT")
+        ]
+
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+
+def _truncate(shape: str, length: int = 120) -> str:
+    return shape if len(shape) <= length else shape[: length - 1] + "…"
+
+
+def format_report(
+    profile: RequestProfile, status: int, elapsed: float, threshold: int
+) -> str:
+    db_seconds = sum(seconds for _, seconds in profile.statements)
+    shapes = profile.shapes()
+    lines = [
+        f"{profile.method} {profile.path} {status} took {elapsed * 1000:.1f}ms: "
+        f"{len(profile.statements)} queries ({len(shapes)} distinct) "
+        f"in {db_seconds * 1000:.1f}ms"
+    ]
+    for shape, count, seconds in shapes[:REPORT_SHAPES]:
+        marker = " [N+1?]" if count >= threshold and shape.startswith("SELECT") else ""
+        lines.append(
+            f"  {count:>4}x {seconds * 1000:>8.1f}ms  {_truncate(shape)}{marker}"
+        )
+    return "\n".join(lines)
+
+
+class StackSampler:
+    """Samples the stacks of requests being profiled from a daemon thread."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles: dict[int, RequestProfile] = {}
+        self._wake = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profiling-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def add(self, profile: RequestProfile) -> None:
+        self._profiles[id(profile)] = profile
+        self._wake.set()
+
+    def remove(self, profile: RequestProfile) -> None:
+        self._profiles.pop(id(profile), None)
+
+    def _run(self) -> None:
+        while True:
+            if not self._profiles:
+                self._wake.clear()
+                self._wake.wait()
+            time.sleep(self.interval)
+
+            frames = sys._current_frames()
+            for profile in list(self._profiles.values()):
+                frame = frames.get(profile.thread_id)
+                stack = []
+                while frame is not None:
+                    stack.append(frame)
+                    if frame is profile.root_frame:
+                        # Only the part of the stack that runs this request
+                        profile.stacks[
+                            ";".join(
+                                f"{f.f_code.co_name} "
+                                f"({Path(f.f_code.co_filename).name}"
+                                f":{f.f_code.co_firstlineno})"
+                                for f in reversed(stack)
+                            )
+                        ] += 1
+                        break
+                    frame = frame.f_back
+
+
+class ProfileDumps:
+    """Keeps the ``max_dumps`` slowest CPU profiles on disk."""
+
+    def __init__(self, directory: Path, max_dumps: int):
+        self.directory = directory
+        self.max_dumps = max_dumps
+        self._dumps: list[tuple[float, Path]] = []
+
+    def add(self, profile: RequestProfile, elapsed: float) -> Path | None:
+        # Copied in one step: the sampler thread may still be adding to it
+        stacks = dict(profile.stacks)
+        if not stacks:
+            return None
+        if len(self._dumps) >= self.max_dumps and elapsed <= self._dumps[0][0]:
+            return None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", profile.path).strip("_") or "root"
+        path = self.directory / (
+            f"{time.strftime('%Y%m%dT%H%M%S')}-{profile.method}-{slug}"
+            f"-{elapsed * 1000:.0f}ms.folded"
+        )
+        path.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in stacks.items())
+        )
+
+        heapq.heappush(self._dumps, (elapsed, path))
+        if len(self._dumps) > self.max_dumps:
+            _, fastest = heapq.heappop(self._dumps)
+            fastest.unlink(missing_ok=True)
+        return path
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp, settings: ProfilingSettings):
+        self.app = app
+        self.settings = settings
+        self.slow_seconds = settings.slow_request_ms / 1000
+        self.sampler = (
+            StackSampler(settings.sample_interval_ms / 1000)
+            if settings.cpu_profile
+            else None
+        )
+        self.dumps = ProfileDumps(Path(settings.dump_dir), settings.max_dumps)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        profile = RequestProfile(
+            method=scope["method"],
+            path=scope["path"],
+            thread_id=threading.get_ident(),
+            root_frame=getattr(task.get_coro(), "cr_frame", None) if task else None,
+        )
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _current_profile.set(profile)
+        if self.sampler:
+            self.sampler.add(profile)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_profile.reset(token)
+            if self.sampler:
+                self.sampler.remove(profile)
+            self.report(profile, status, scope)
+
+    def report(self, profile: RequestProfile, status: int, scope: Scope) -> None:
+        elapsed = time.perf_counter() - profile.started
+        route = scope.get("route")
+        if route is not None:
+            profile.path = route.path
+
+        threshold = self.settings.n_plus_one_threshold
+        for shape, count, seconds in profile.n_plus_one(threshold):
+            logger.warning(
+                f"Possible N+1 in {profile.method} {profile.path}: {count} queries "
+                f"({seconds * 1000:.1f}ms) of {_truncate(shape)}"
+            )
+
+        if elapsed < self.slow_seconds:
+            return
+        report = format_report(profile, status, elapsed, threshold)
+        if self.sampler and (path := self.dumps.add(profile, elapsed)):
+            report += f"\n  CPU profile: {path}"
+        logger.warning(f"Slow request {report}")
+
+
+def profile_engine(engine: AsyncEngine) -> None:
+    """Attribute the engine's statements to the request being profiled."""
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        if context is not None and _current_profile.get() is not None:
+            context._profile_started = time.perf_counter()
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        profile = _current_profile.get()
+        started = getattr(context, "_profile_started", None)
+        if profile is not None and started is not None:
+            profile.record(statement, time.perf_counter() - started)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+
+
+def install_profiling(app: FastAPI, settings: ProfilingSettings) -> None:
+    """Add the middleware; engines are passed to ``profile_engine`` on startup."""
+    app.add_middleware(ProfilingMiddleware, settings=settings)
+    logger.info(
+        f"Request profiling enabled (slow requests >= {settings.slow_request_ms}ms, "
+        f"CPU profiles {'on' if settings.cpu_profile else 'off'})"
+    )
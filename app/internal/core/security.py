@@ -1,3 +1,5 @@
+import asyncio
+import time
 from datetime import UTC, datetime, timedelta
 from typing import Annotated, Optional
 
@@ -5,24 +7,14 @@ import jwt
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt.exceptions import InvalidTokenError
-from passlib.context import CryptContext
 from sqlmodel import select
+from starlette.requests import HTTPConnection
 
-from app.internal.core.db import SessionDep
+from app.internal.core.db import DirectoryReadSessionDep
 from app.internal.core.settings import SettingsDep
 from app.internal.models.jwt import Token, TokenData
 from app.internal.models.user import User, UserPublic
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
 
 def create_access_token(
     data: TokenData,
@@ -54,6 +46,71 @@ def decode_token(token: str, settings: SettingsDep) -> TokenData:
         raise HTTPException(status_code=401, detail="Failed to decode token")
 
 
+class TokenRevocations:
+    """
+    In-process view of revoked tokens for the stateless authentication mode.
+
+    Individual tokens are revoked by ``jti`` in a local set (so a sign-out only
+    applies to the worker that served it), while "sign out everywhere" bumps
+    ``User.token_version`` in the database. The versions are re-read at most
+    every ``refresh_seconds``, never per request.
+    """
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self._revoked_jtis: dict[str, float] = {}
+        self._token_versions: dict[int, int] = {}
+        self._refreshed_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def is_stale(self) -> bool:
+        return (
+            self._refreshed_at is None
+            or time.monotonic() - self._refreshed_at >= self.refresh_seconds
+        )
+
+    async def refresh(self, session: DirectoryReadSessionDep) -> None:
+        async with self._lock:
+            # Another request may have refreshed while we waited for the lock
+            if not self.is_stale():
+                return
+
+            result = await session.exec(
+                select(User.id, User.token_version).where(User.token_version > 0)
+            )
+            self._token_versions = {
+                user_id: version for user_id, version in result.all() if user_id
+            }
+
+            now = time.time()
+            self._revoked_jtis = {
+                jti: exp for jti, exp in self._revoked_jtis.items() if exp > now
+            }
+            self._refreshed_at = time.monotonic()
+
+    def revoke(self, payload: TokenData) -> None:
+        if payload.jti and payload.exp:
+            self._revoked_jtis[payload.jti] = payload.exp.timestamp()
+
+    def set_token_version(self, user_id: int, version: int) -> None:
+        self._token_versions[user_id] = version
+
+    def is_revoked(self, payload: TokenData) -> bool:
+        if payload.jti and payload.jti in self._revoked_jtis:
+            return True
+
+        if payload.uid is None:
+            return False
+        return (payload.ver or 0) < self._token_versions.get(payload.uid, 0)
+
+
+def get_token_revocations(connection: HTTPConnection) -> TokenRevocations:
+    # Created by the app's lifespan, see app.main.create_app
+    return connection.app.state.token_revocations
+
+
+TokenRevocationsDep = Annotated[TokenRevocations, Depends(get_token_revocations)]
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 TokenDep = Annotated[str, Depends(oauth2_scheme)]
@@ -61,8 +118,9 @@ TokenDep = Annotated[str, Depends(oauth2_scheme)]
 
 async def get_current_user(
     token: TokenDep,
-    session: SessionDep,
+    session: DirectoryReadSessionDep,
     settings: SettingsDep,
+    revocations: TokenRevocationsDep,
 ):
     payload = decode_token(token, settings)
     username = payload.sub
@@ -70,11 +128,27 @@ async def get_current_user(
     if not username:
         raise HTTPException(status_code=401, detail="Invalid token payload")
 
+    if revocations.is_revoked(payload):
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
+    # Stateless fast path: the identity is signed into the token, so the only
+    # database access is the periodic refresh of the token versions.
+    if settings.jwt.stateless and payload.uid is not None:
+        if revocations.is_stale():
+            await revocations.refresh(session)
+            if revocations.is_revoked(payload):
+                raise HTTPException(status_code=401, detail="Token has been revoked")
+
+        return UserPublic(id=payload.uid, username=username)
+
     user_result = await session.exec(select(User).where(User.username == username))
     user = user_result.first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
+    if payload.ver is not None and payload.ver < user.token_version:
+        raise HTTPException(status_code=401, detail="Token has been revoked")
+
     return UserPublic(**user.model_dump())
 
 
@@ -0,0 +1,56 @@
+"""
+Fast JSON serialization for trusted ORM output.
+
+Routes declare ``response_model`` for validation and OpenAPI. On the hot list
+endpoints that means FastAPI validates every ORM row (and its nested tags)
+against the public model before encoding it with the stdlib json module. The
+rows come straight from our own tables, so with ``api.fast_json`` enabled the
+routes build the public payload by hand and encode it with pydantic-core's
+Rust encoder instead. The ``dump_*`` functions must stay in sync with the
+matching ``*Public`` models.
+"""
+
+from typing import Any, Iterable
+
+import pydantic_core
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+from app.internal.models.tag import Tag
+from app.internal.models.task import Task
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+def dump_tag(tag: Tag) -> dict[str, Any]:
+    """Same output as ``TagPublic``."""
+    return {"name": tag.name, "id": tag.id}
+
+
+def dump_tag_with_counts(tag: Tag) -> dict[str, Any]:
+    """Same output as ``TagPublicWithCounts``."""
+    return {
+        "name": tag.name,
+        "id": tag.id,
+        "task_count": tag.task_count,
+        "open_task_count": tag.open_task_count,
+    }
+
+
+def dump_task(task: Task) -> dict[str, Any]:
+    """Same output as ``TaskPublic``; ``task.tags`` must already be loaded."""
+    return {
+        "title": task.title,
+        "description": task.description,
+        "done": task.done,
+        "id": task.id,
+        "tags": [dump_tag(tag) for tag in task.tags],
+    }
+
+
+def json_response(content: Iterable[dict[str, Any]], response: Response) -> Response:
+    """Render ``content``, keeping the headers set on the injected response."""
+    return FastJSONResponse(list(content), headers=response.headers)
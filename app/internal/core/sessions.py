@@ -0,0 +1,67 @@
+"""
+Sessions on the shard holding the current user's tasks and tags.
+
+Routes declare ``SessionDep`` (the writer for write requests, a reader for
+GET/HEAD) or ``ReadSessionDep`` and get a session on the right shard without
+knowing about sharding. Unsharded, the shard is the directory database and
+the read session is the one already used to load the current user.
+"""
+
+from typing import Annotated, AsyncGenerator
+
+from fastapi import Depends, Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.core.db import (
+    READ_METHODS,
+    DatabaseDep,
+    DirectoryReadSessionDep,
+)
+from app.internal.core.group_commit import GroupCommitter
+from app.internal.core.security import CurrentUserDep
+
+
+async def get_read_session(
+    database: DatabaseDep,
+    current_user: CurrentUserDep,
+    directory_session: DirectoryReadSessionDep,
+) -> AsyncGenerator[AsyncSession, None]:
+    shard = database.shard_for(current_user.id)
+    if shard is database.directory:
+        yield directory_session
+        return
+
+    async with shard.read_session() as session:
+        yield session
+
+
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_session)]
+
+
+async def get_async_session(
+    request: Request,
+    database: DatabaseDep,
+    current_user: CurrentUserDep,
+    read_session: ReadSessionDep,
+) -> AsyncGenerator[AsyncSession, None]:
+    # Sessions only check out a connection on first use, so the unused read
+    # session of a write request costs nothing.
+    if request.method in READ_METHODS:
+        yield read_session
+        return
+
+    async with database.shard_for(current_user.id).write_session() as session:
+        yield session
+
+
+SessionDep = Annotated[AsyncSession, Depends(get_async_session)]
+
+
+def get_group_commit(
+    database: DatabaseDep, current_user: CurrentUserDep
+) -> GroupCommitter:
+    # Routes using it must not also hold the writer through SessionDep
+    return database.shard_for(current_user.id).writes
+
+
+GroupCommitDep = Annotated[GroupCommitter, Depends(get_group_commit)]
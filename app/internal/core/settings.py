@@ -1,33 +1,144 @@
-from functools import lru_cache
-from typing import Annotated
+from pathlib import Path
+from typing import Annotated, Literal
 
 from fastapi import Depends
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from pydantic_settings import (
     BaseSettings,
     PydanticBaseSettingsSource,
     SettingsConfigDict,
     YamlConfigSettingsSource,
 )
+from starlette.requests import HTTPConnection
 
 
 class SqliteSettings(BaseModel):
     file_name: str = "database.db"
+    journal_mode: Literal["wal", "delete", "truncate", "persist", "memory"] = "wal"
+    synchronous: Literal["off", "normal", "full", "extra"] = "normal"
+    # Negative values are in KiB, positive values in pages
+    cache_size: int = -64000
+    mmap_size: int = 268435456
+    busy_timeout: int = Field(default=5000, ge=0, description="In milliseconds")
+    # Read-only connections shared by GET/HEAD requests
+    reader_pool_size: int = Field(default=4, ge=1)
+    # How long (in seconds) a write may wait for the single writer connection
+    writer_queue_timeout: float = Field(default=30.0, gt=0)
+
+
+class GroupCommitSettings(BaseModel):
+    # Commit concurrent task creates/updates/deletes together, see group_commit.py
+    enabled: bool = False
+    # How long the first write of a group waits for others, in milliseconds
+    window_ms: float = Field(default=2, ge=0)
+    max_ops: int = Field(default=64, ge=1)
 
 
 class DatabaseSettings(BaseModel):
     sqlite: SqliteSettings
+    group_commit: GroupCommitSettings = GroupCommitSettings()
+    # Spread tasks and tags over this many shard files by user id, each with its
+    # own writer; 0 keeps everything in ``sqlite.file_name``. Can't be changed
+    # once there is data.
+    shards: int = Field(default=0, ge=0)
+
+    def shard_file_names(self) -> list[str]:
+        """Shard files, next to ``sqlite.file_name`` (``database.shard0.db``, ...)."""
+        path = Path(self.sqlite.file_name)
+        return [
+            str(path.with_name(f"{path.stem}.shard{index}{path.suffix}"))
+            for index in range(self.shards)
+        ]
 
 
 class JwtSettings(BaseModel):
     secret_key: str
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    # Trust the user id/username signed into the token instead of loading the
+    # user from the database on every request.
+    stateless: bool = False
+    # How often (in seconds) the per-user token versions are re-read from the
+    # database when running stateless.
+    revocation_refresh_seconds: int = 30
+
+
+class PasswordHashingSettings(BaseModel):
+    # bcrypt cost factor; hashes with a different cost are rehashed on login
+    bcrypt_rounds: int = Field(default=12, ge=4, le=31)
+    executor: Literal["thread", "process"] = "thread"
+    max_workers: int = Field(default=4, ge=1)
+    # Operations allowed to wait for a free worker before new ones are rejected
+    max_pending: int = Field(default=64, ge=0)
+
+
+class ApiSettings(BaseModel):
+    # Serialize list responses straight from the ORM rows, skipping the
+    # response_model validation pass
+    fast_json: bool = True
+
+
+class LoginThrottleSettings(BaseModel):
+    enabled: bool = True
+    # Sign-ins processed at once; further attempts get a 429 right away
+    max_concurrent: int = Field(default=8, ge=1)
+    # Token buckets: attempts allowed in a burst, then the sustained rate
+    ip_burst: int = Field(default=20, ge=1)
+    ip_per_minute: float = Field(default=60, gt=0)
+    username_burst: int = Field(default=5, ge=1)
+    username_per_minute: float = Field(default=5, gt=0)
+    # Buckets kept in memory per kind; the least recently used are dropped
+    max_tracked: int = Field(default=10000, ge=1)
+
+
+class ReadCacheSettings(BaseModel):
+    # Per-worker cache of rendered task/tag read responses
+    enabled: bool = True
+    max_entries: int = Field(default=10000, ge=1)
+    # Total size of the cached response bodies, in bytes
+    max_bytes: int = Field(default=64 * 1024 * 1024, ge=1)
+    ttl_seconds: float = Field(default=60.0, gt=0)
+
+
+class ChangeFeedSettings(BaseModel):
+    # Events buffered per GET /changes connection; a consumer that falls
+    # further behind gets a single "resync" event instead
+    buffer_size: int = Field(default=256, ge=1)
+    # Interval of the keep-alive comments sent to every connection
+    heartbeat_seconds: float = Field(default=15, gt=0)
+    max_connections_per_user: int = Field(default=5, ge=1)
+
+
+class SyncSettings(BaseModel):
+    # Tombstones older than this are removed by app.commands.prune_tombstones;
+    # GET /sync answers 410 to the cursors that needed them
+    tombstone_retention_days: float = Field(default=90, gt=0)
+
+
+class ProfilingSettings(BaseModel):
+    # Record the SQL issued by every request; meant for troubleshooting
+    enabled: bool = False
+    # Requests at least this slow (in milliseconds) get a report logged
+    slow_request_ms: float = Field(default=500, ge=0)
+    # Repetitions of one SELECT shape within a request reported as N+1
+    n_plus_one_threshold: int = Field(default=5, ge=2)
+    # Sample the stacks of requests and dump the slowest ones
+    cpu_profile: bool = False
+    sample_interval_ms: float = Field(default=5, gt=0)
+    dump_dir: str = "profiles"
+    max_dumps: int = Field(default=20, ge=1)
 
 
 class Settings(BaseSettings):
     database: DatabaseSettings
     jwt: JwtSettings
+    password_hashing: PasswordHashingSettings = PasswordHashingSettings()
+    api: ApiSettings = ApiSettings()
+    login_throttle: LoginThrottleSettings = LoginThrottleSettings()
+    read_cache: ReadCacheSettings = ReadCacheSettings()
+    change_feed: ChangeFeedSettings = ChangeFeedSettings()
+    sync: SyncSettings = SyncSettings()
+    profiling: ProfilingSettings = ProfilingSettings()
 
     model_config = SettingsConfigDict(yaml_file="config.yaml")
 
@@ -40,12 +151,33 @@ class Settings(BaseSettings):
         dotenv_settings: PydanticBaseSettingsSource,
         file_secret_settings: PydanticBaseSettingsSource,
     ) -> tuple[PydanticBaseSettingsSource, ...]:
-        return (YamlConfigSettingsSource(settings_cls),)
+        # Keyword arguments win, so that create_app() can be handed settings
+        return (init_settings, YamlConfigSettingsSource(settings_cls))
+
+
+_settings: Settings | None = None
+
+
+def get_settings() -> Settings:
+    """
+    The process-wide settings, read from ``config.yaml`` on first use unless
+    ``use_settings`` was called before.
+    """
+    global _settings
+    if _settings is None:
+        # The required sections come from config.yaml
+        _settings = Settings()  # type: ignore[call-arg]
+    return _settings
+
+
+def use_settings(settings: Settings) -> None:
+    global _settings
+    _settings = settings
 
 
-@lru_cache
-def get_settings():
-    return Settings()
+def get_app_settings(connection: HTTPConnection) -> Settings:
+    # The settings the app was built with, see app.main.create_app
+    return connection.app.state.settings
 
 
-SettingsDep = Annotated[Settings, Depends(get_settings)]
+SettingsDep = Annotated[Settings, Depends(get_app_settings)]
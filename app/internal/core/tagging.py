@@ -0,0 +1,151 @@
+"""
+Tag assignment over ``TaskTagLink``.
+
+All writes to ``task_tag_links`` go through this module. Re-tagging compares
+the current and requested tag ids of each task and only issues the bulk
+INSERT and DELETE statements for the difference, with tag ownership checked
+in the same query that reads the current links.
+
+``get_tags_by_task`` is the batched read used wherever tags are loaded
+without the ORM relationship (export, sparse task reads).
+"""
+
+from dataclasses import dataclass, field
+from typing import Iterable, Sequence
+
+from sqlalchemy import and_, or_, tuple_
+from sqlmodel import col, delete, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.models.tag import Tag
+from app.internal.models.task_tag_link import TaskTagLink
+
+# (task_id, tag_id) pairs
+Link = tuple[int, int]
+
+
+@dataclass
+class TagAssignment:
+    # Names of the owned tags among the requested ones, by id
+    tags: dict[int, str] = field(default_factory=dict)
+    added: list[Link] = field(default_factory=list)
+    removed: list[Link] = field(default_factory=list)
+    # Tasks left untouched because they requested tags the user doesn't own
+    rejected: set[int] = field(default_factory=set)
+
+
+async def get_owned_tags(
+    session: AsyncSession, user_id: int, tag_ids: Iterable[int]
+) -> dict[int, str]:
+    """Return the names of the given tags that belong to the user, by id."""
+    tag_ids = set(tag_ids)
+    if not tag_ids:
+        return {}
+
+    result = await session.exec(
+        select(Tag.id, Tag.name).where(Tag.user_id == user_id, col(Tag.id).in_(tag_ids))
+    )
+    return {tag_id: name for tag_id, name in result.all() if tag_id is not None}
+
+
+async def get_tags_by_task(
+    session: AsyncSession, task_ids: Sequence[int]
+) -> dict[int, list[dict]]:
+    """
+    Return the tags of the given tasks by task, as dicts with the keys of
+    ``TagPublic`` in its order (like ``serialization.dump_tag``).
+    """
+    result = await session.exec(
+        select(TaskTagLink.task_id, Tag.id, Tag.name)
+        .join(Tag, col(Tag.id) == TaskTagLink.tag_id)
+        .where(col(TaskTagLink.task_id).in_(task_ids))
+        .order_by(col(Tag.id))
+    )
+    tags_by_task: dict[int, list[dict]] = {}
+    for task_id, tag_id, name in result.all():
+        tags_by_task.setdefault(task_id, []).append({"name": name, "id": tag_id})
+    return tags_by_task
+
+
+async def insert_links(session: AsyncSession, links: Iterable[Link]) -> None:
+    params = [{"task_id": task_id, "tag_id": tag_id} for task_id, tag_id in links]
+    if params:
+        await session.execute(insert(TaskTagLink), params=params)
+
+
+async def delete_links(session: AsyncSession, links: Iterable[Link]) -> None:
+    links = list(links)
+    if links:
+        await session.execute(
+            delete(TaskTagLink).where(
+                tuple_(col(TaskTagLink.task_id), col(TaskTagLink.tag_id)).in_(links)
+            )
+        )
+
+
+async def unlink_tasks(session: AsyncSession, task_ids: Iterable[int]) -> None:
+    """Remove every tag link of tasks that are about to be deleted."""
+    task_ids = list(task_ids)
+    if task_ids:
+        await session.execute(
+            delete(TaskTagLink).where(col(TaskTagLink.task_id).in_(task_ids))
+        )
+
+
+async def assign_tags(
+    session: AsyncSession, user_id: int, assignments: dict[int, set[int]]
+) -> TagAssignment:
+    """
+    Make the tags of each task exactly the requested set of tag ids.
+
+    One query reads both the user's tags among the requested ids and the
+    current links of the tasks; then only the missing links are inserted and
+    only the dropped ones deleted. Tasks requesting a tag the user doesn't own
+    are rejected and left unchanged.
+    """
+    assignment = TagAssignment()
+    if not assignments:
+        return assignment
+
+    requested_ids = set().union(*assignments.values())
+    result = await session.exec(
+        select(Tag.id, Tag.name, TaskTagLink.task_id)
+        .outerjoin(
+            TaskTagLink,
+            and_(
+                col(TaskTagLink.tag_id) == Tag.id,
+                col(TaskTagLink.task_id).in_(assignments),
+            ),
+        )
+        .where(
+            Tag.user_id == user_id,
+            or_(
+                col(Tag.id).in_(requested_ids),
+                col(TaskTagLink.task_id).is_not(None),
+            ),
+        )
+    )
+
+    current: dict[int, set[int]] = {task_id: set() for task_id in assignments}
+    for tag_id, name, task_id in result.all():
+        if tag_id is None:
+            continue
+        if tag_id in requested_ids:
+            assignment.tags[tag_id] = name
+        if task_id is not None:
+            current[task_id].add(tag_id)
+
+    for task_id, tag_ids in assignments.items():
+        if not tag_ids <= assignment.tags.keys():
+            assignment.rejected.add(task_id)
+            continue
+        assignment.added.extend(
+            (task_id, tag_id) for tag_id in tag_ids - current[task_id]
+        )
+        assignment.removed.extend(
+            (task_id, tag_id) for tag_id in current[task_id] - tag_ids
+        )
+
+    await delete_links(session, assignment.removed)
+    await insert_links(session, assignment.added)
+    return assignment
@@ -0,0 +1,138 @@
+"""
+Admission control for password sign-in.
+
+Every ``/token`` attempt costs a bcrypt verification, so a login burst (or a
+brute-force run) can keep every hashing worker busy. Before any of that work
+starts, an attempt must:
+
+* find a free slot among ``max_concurrent`` sign-ins being processed, and
+* take a token from the bucket of its client IP and from the bucket of the
+  username it targets.
+
+Rejections are answered with 429 and a ``Retry-After`` computed from the
+bucket refill rate, without touching the database or the hashing pool.
+Buckets live in bounded LRU maps: once ``max_tracked`` keys are held, the
+least recently used one is dropped. An idle bucket has usually refilled
+already, so dropping it costs nothing.
+"""
+
+import math
+import time
+from collections import OrderedDict
+from typing import Annotated, AsyncGenerator, Callable
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
+
+from app.internal.core.metrics import Counter
+from app.internal.core.settings import LoginThrottleSettings
+
+LOGIN_REJECTIONS = Counter(
+    "login_rejections_total",
+    "Sign-in attempts rejected before verifying the password",
+    ("reason",),
+)
+
+
+class TokenBuckets:
+    """Token buckets by key, holding at most ``max_keys`` of them."""
+
+    def __init__(
+        self,
+        burst: int,
+        per_minute: float,
+        max_keys: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.burst = burst
+        self.rate = per_minute / 60
+        self.max_keys = max_keys
+        self._clock = clock
+        # key -> [tokens, last refill time], least recently used first
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+
+    def take(self, key: str) -> float:
+        """Take one token; returns 0, or the seconds until one is available."""
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0
+        return (1 - bucket[0]) / self.rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class LoginThrottle:
+    def __init__(self, settings: LoginThrottleSettings):
+        self.enabled = settings.enabled
+        self.max_concurrent = settings.max_concurrent
+        self.in_flight = 0
+        self.by_ip = TokenBuckets(
+            settings.ip_burst, settings.ip_per_minute, settings.max_tracked
+        )
+        self.by_username = TokenBuckets(
+            settings.username_burst, settings.username_per_minute, settings.max_tracked
+        )
+
+    def admit(self, ip: str, username: str) -> None:
+        """
+        Raise 429 unless the attempt may go on; call before counting it in
+        ``in_flight`` (see ``admit_login``).
+        """
+        if self.in_flight >= self.max_concurrent:
+            self._reject("concurrency", 1)
+
+        retry_after = self.by_ip.take(ip)
+        if retry_after:
+            self._reject("ip", retry_after)
+
+        # Usernames are stored lowercase; the cap bounds the memory per key
+        retry_after = self.by_username.take(username.lower()[:64])
+        if retry_after:
+            self._reject("username", retry_after)
+
+    def _reject(self, reason: str, retry_after: float) -> None:
+        LOGIN_REJECTIONS.inc(reason)
+        raise HTTPException(
+            status_code=429,
+            detail="Too many sign-in attempts, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def get_login_throttle(request: Request) -> LoginThrottle:
+    # Created by the app's lifespan, see app.main.create_app
+    return request.app.state.login_throttle
+
+
+LoginThrottleDep = Annotated[LoginThrottle, Depends(get_login_throttle)]
+
+
+async def admit_login(
+    request: Request,
+    form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
+    throttle: LoginThrottleDep,
+) -> AsyncGenerator[None, None]:
+    """Route dependency holding a sign-in slot for the rest of the request."""
+    if not throttle.enabled:
+        yield
+        return
+
+    throttle.admit(request.client.host if request.client else "", form_data.username)
+    # The counter is only touched from the event loop thread, so no lock
+    throttle.in_flight += 1
+    try:
+        yield
+    finally:
+        throttle.in_flight -= 1
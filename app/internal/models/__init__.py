@@ -1,5 +1,18 @@
 from .jwt import Token, TokenData  # noqa: F401
+from .sync import SyncDeleted, SyncPage, SyncTask, Tombstone  # noqa: F401
 from .tag import Tag  # noqa: F401
-from .task import Task, TaskCreate, TaskPublic, TaskUpdate  # noqa: F401
+from .task import (  # noqa: F401
+    Task,
+    TaskBatchResult,
+    TaskBatchUpdate,
+    TaskCreate,
+    TaskImport,
+    TaskImportError,
+    TaskImportReport,
+    TaskPublic,
+    TaskSearchResult,
+    TaskUpdate,
+)
+from .task_stats import TaskStats, TaskStatsPublic  # noqa: F401
 from .task_tag_link import TaskTagLink  # noqa: F401
 from .user import User, UserCreate, UserPublic  # noqa: F401
@@ -11,3 +11,7 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     sub: str | None = None
     exp: datetime | None = None
+    # User id and token version, used by the stateless authentication mode
+    uid: int | None = None
+    ver: int | None = None
+    jti: str | None = None
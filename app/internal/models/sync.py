@@ -0,0 +1,42 @@
+from sqlmodel import Field, Index, SQLModel
+
+from .tag import TagPublic
+from .task import TaskBase
+
+
+# One row per deleted task or tag, written by database triggers
+class Tombstone(SQLModel, table=True):
+    __tablename__ = "tombstones"
+    # Backs GET /sync (WHERE user_id = ? AND change_seq > ?)
+    __table_args__ = (
+        Index("ix_tombstones_user_id_change_seq", "user_id", "change_seq"),
+    )
+
+    id: int | None = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="users.id")
+    # "task" or "tag"
+    entity: str
+    entity_id: int
+    change_seq: int
+    # Unix time of the delete, for app.commands.prune_tombstones
+    deleted_at: int = Field(default=0)
+
+
+# Sync schemas (for the /sync endpoint)
+class SyncTask(TaskBase):
+    id: int
+    # Tags are sent once in SyncPage.tags and referenced by id
+    tag_ids: list[int] = Field(default=[])
+
+
+class SyncDeleted(SQLModel):
+    tasks: list[int] = Field(default=[])
+    tags: list[int] = Field(default=[])
+
+
+class SyncPage(SQLModel):
+    tags: list[TagPublic]
+    tasks: list[SyncTask]
+    deleted: SyncDeleted
+    cursor: str = Field(description="Pass as since= to get the following changes")
+    has_more: bool = Field(description="Whether more changes are already waiting")
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel import Field, Index, Relationship, SQLModel
 
 from .task_tag_link import TaskTagLink
 
@@ -15,10 +15,18 @@ class TagBase(SQLModel):
 
 class Tag(TagBase, table=True):
     __tablename__ = "tags"
+    # Backs GET /sync (WHERE user_id = ? AND change_seq > ?)
+    __table_args__ = (Index("ix_tags_user_id_change_seq", "user_id", "change_seq"),)
 
     id: int | None = Field(default=None, primary_key=True)
     name: str = Field(min_length=3, max_length=50)
     user_id: int = Field(foreign_key="users.id")
+    # Set by database triggers to the user's data_version + 1 when the tag is
+    # created or renamed
+    change_seq: int = Field(default=0)
+    # Maintained by database triggers on task_tag_links and tasks.done
+    task_count: int = Field(default=0)
+    open_task_count: int = Field(default=0)
     tasks: list["Task"] = Relationship(back_populates="tags", link_model=TaskTagLink)
 
 
@@ -26,6 +34,11 @@ class TagPublic(TagBase):
     id: int
 
 
+class TagPublicWithCounts(TagPublic):
+    task_count: int
+    open_task_count: int
+
+
 class TagCreate(TagBase):
     pass
 
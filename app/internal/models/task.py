@@ -1,7 +1,7 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Annotated
 
 from pydantic import field_validator
-from sqlmodel import Field, Relationship, SQLModel
+from sqlmodel import Field, Index, Relationship, SQLModel
 
 from app.internal.core.validators import (
     validate_task_description,
@@ -49,9 +49,18 @@ class TaskBase(SQLModel):
 # Table model
 class Task(TaskBase, table=True):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Backs the keyset pagination of GET /tasks (WHERE user_id = ? AND id < ?)
+        Index("ix_tasks_user_id_id", "user_id", "id"),
+        # Backs GET /sync (WHERE user_id = ? AND change_seq > ?)
+        Index("ix_tasks_user_id_change_seq", "user_id", "change_seq"),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="users.id")
+    # Set by database triggers to the user's data_version + 1 on every change
+    # of the task or of its tag links
+    change_seq: int = Field(default=0)
     # Use string forward reference
     user: "User" = Relationship(back_populates="tasks")
     tags: list["Tag"] = Relationship(back_populates="tasks", link_model=TaskTagLink)
@@ -116,3 +125,41 @@ class TaskUpdate(SQLModel):
     @classmethod
     def validate_description_field(cls, v: str | None) -> str | None:
         return validate_task_description(v)
+
+
+# Batch schemas (for the /tasks/batch endpoints)
+class TaskBatchUpdate(TaskUpdate):
+    id: int
+
+
+class TaskBatchResult(SQLModel):
+    index: int = Field(description="Position of the item in the request")
+    id: int | None = None
+    status: int = Field(description="HTTP status code for this item")
+    detail: str | None = None
+
+
+# Import schemas (for the /tasks/import endpoint)
+class TaskImport(TaskBase):
+    tags: list[Annotated[str, Field(min_length=3, max_length=50)]] = Field(default=[])
+
+
+class TaskImportError(SQLModel):
+    row: int = Field(description="1-based position of the row in the upload")
+    detail: str
+
+
+class TaskImportReport(SQLModel):
+    rows_total: int
+    rows_imported: int
+    rows_failed: int
+    tags_created: int
+    elapsed_seconds: float
+    rows_per_second: float
+    errors: list[TaskImportError] = Field(default=[])
+
+
+# Search schema (for the /tasks/search endpoint)
+class TaskSearchResult(TaskPublic):
+    rank: float = Field(description="bm25 score, lower is more relevant")
+    snippet: str
@@ -0,0 +1,22 @@
+from sqlmodel import Field, SQLModel
+
+from .tag import TagPublicWithCounts
+
+
+# Per-user counters, maintained by database triggers on tasks and task_tag_links
+class TaskStats(SQLModel, table=True):
+    __tablename__ = "task_stats"
+
+    user_id: int = Field(foreign_key="users.id", primary_key=True)
+    task_count: int = Field(default=0)
+    done_task_count: int = Field(default=0)
+    # Tasks without any tag
+    untagged_task_count: int = Field(default=0)
+
+
+class TaskStatsPublic(SQLModel):
+    task_count: int
+    done_task_count: int
+    open_task_count: int
+    untagged_task_count: int
+    tags: list[TagPublicWithCounts]
@@ -1,8 +1,9 @@
-from sqlmodel import Field, SQLModel
+from sqlmodel import Field, Index, SQLModel
 
 
 class TaskTagLink(SQLModel, table=True):
     __tablename__ = "task_tag_links"
+    __table_args__ = (Index("ix_task_tag_links_tag_id", "tag_id"),)
 
     task_id: int = Field(foreign_key="tasks.id", primary_key=True)
     tag_id: int = Field(foreign_key="tags.id", primary_key=True)
@@ -85,5 +85,12 @@ class User(UserBase, table=True):
 
     id: int | None = Field(default=None, primary_key=True)
     password: str  # This stores the hashed password
+    # Bumped to invalidate every token issued to this user
+    token_version: int = Field(default=0)
+    # Bumped by every write to the user's tasks and tags, used for ETags
+    data_version: int = Field(default=0)
+    # Highest change_seq of the user's pruned tombstones; older sync cursors
+    # have expired
+    tombstones_pruned_seq: int = Field(default=0)
     # Use string forward reference
     tasks: list["Task"] = Relationship(back_populates="user")
@@ -1,18 +1,68 @@
+"""
+Application factory.
+
+Importing this module is cheap and has no side effects: settings are not
+read, no engine is created and the routers aren't imported until
+``create_app`` runs. Database engines, the password hashing pool and the
+change feed hub are created when the app starts (its lifespan) and disposed
+of when it stops, so that worker processes forked from a parent never inherit
+open connections or executor threads. The read cache, login throttle and
+token revocations are created there too, from the app's own settings, so
+that each app built by ``create_app`` gets its own.
+
+``app`` is still available for ``uvicorn app.main:app`` and ``fastapi dev``;
+it is built from ``config.yaml`` the first time it is accessed.
+"""
+
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request, status
 from fastapi.responses import JSONResponse
 
-from app.routers import auth, tags, tasks
+from app.internal.core.settings import Settings, get_settings, use_settings
 
 # Configure basic logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    from app.internal.core.cache import ReadCache
+    from app.internal.core.changes import ChangeHub
+    from app.internal.core.db import ShardedDatabase
+    from app.internal.core.hashing import PasswordHasher
+    from app.internal.core.profiling import profile_engine
+    from app.internal.core.security import TokenRevocations
+    from app.internal.core.throttling import LoginThrottle
+
+    settings: Settings = app.state.settings
+    database = ShardedDatabase(settings.database)
+    if settings.profiling.enabled:
+        for sqlite in database.databases():
+            profile_engine(sqlite.writer)
+            profile_engine(sqlite.reader)
+    password_hasher = PasswordHasher(settings.password_hashing)
+    change_hub = ChangeHub(settings.change_feed)
+
+    app.state.database = database
+    app.state.password_hasher = password_hasher
+    app.state.change_hub = change_hub
+    app.state.read_cache = ReadCache(settings.read_cache)
+    app.state.login_throttle = LoginThrottle(settings.login_throttle)
+    app.state.token_revocations = TokenRevocations(
+        settings.jwt.revocation_refresh_seconds
+    )
+    try:
+        yield
+    finally:
+        await change_hub.close()
+        password_hasher.shutdown()
+        # Pooled aiosqlite connections run on their own threads
+        await database.dispose()
 
 
-@app.exception_handler(Exception)
 async def generic_exception_handler(request: Request, exc: Exception):
     logger.error(f"Unhandled exception for request {request.url}: {exc}", exc_info=True)
     return JSONResponse(
@@ -21,11 +71,52 @@ async def generic_exception_handler(request: Request, exc: Exception):
     )
 
 
-app.include_router(auth.router)
-app.include_router(tasks.router)
-app.include_router(tags.router)
+def create_app(settings: Settings | None = None) -> FastAPI:
+    """
+    Build the application. ``settings`` default to ``config.yaml``; when given,
+    they also become the process-wide settings returned by ``get_settings``.
+    """
+    if settings is None:
+        settings = get_settings()
+    else:
+        use_settings(settings)
+
+    from app.internal.core.cache import ReadCacheDep, collect_read_cache_metrics
+    from app.internal.core.metrics import MetricsRoute, render_metrics
+    from app.internal.core.profiling import install_profiling
+    from app.routers import auth, changes, sync, tags, tasks, transfer
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.settings = settings
+    # Before any route is added, so that /health and /metrics are timed too
+    app.router.route_class = MetricsRoute
+
+    if settings.profiling.enabled:
+        install_profiling(app, settings.profiling)
+
+    app.add_exception_handler(Exception, generic_exception_handler)
+
+    app.include_router(auth.router)
+    # Before tasks so that /tasks/export isn't matched as /tasks/{task_id}
+    app.include_router(transfer.router)
+    app.include_router(tasks.router)
+    app.include_router(tags.router)
+    app.include_router(sync.router)
+    app.include_router(changes.router)
+
+    @app.get("/health")
+    async def health_check(read_cache: ReadCacheDep):
+        return {"status": "ok", "read_cache": read_cache.stats()}
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics(read_cache: ReadCacheDep):
+        return render_metrics(collect_read_cache_metrics(read_cache))
+
+    return app
 
 
-@app.get("/health")
-async def health_check():
-    return {"status": "ok"}
+def __getattr__(name: str):
+    if name == "app":
+        globals()["app"] = application = create_app()
+        return application
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,27 +1,44 @@
 import logging
 from typing import Annotated
+from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import select
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import col, delete, select, update
 
-from app.internal.core.db import SessionDep
+from app.internal.core.db import (
+    DatabaseDep,
+    DirectoryReadSessionDep,
+    DirectorySessionDep,
+)
+from app.internal.core.hashing import PasswordHasherDep
+from app.internal.core.metrics import MetricsRoute
 from app.internal.core.security import (
     CurrentUserDep,
     SettingsDep,
+    TokenDep,
+    TokenRevocationsDep,
     create_access_token,
-    get_password_hash,
-    verify_password,
+    decode_token,
 )
+from app.internal.core.throttling import admit_login
 from app.internal.models.jwt import Token, TokenData
 from app.internal.models.user import User, UserCreate, UserPublic
 
-router = APIRouter(tags=["auth"])
+router = APIRouter(tags=["auth"], route_class=MetricsRoute)
 logger = logging.getLogger(__name__)
 
 
 @router.post("/auth/sign-up", response_model=UserPublic, status_code=201)
-async def signUp(payload: UserCreate, session: SessionDep):
+async def signUp(
+    payload: UserCreate,
+    session: DirectoryReadSessionDep,
+    database: DatabaseDep,
+    hasher: PasswordHasherDep,
+):
+    # Like /token: the single writer must not be held while bcrypt runs, so
+    # check on a read session and only write once the hash is ready.
     existing_user_result = await session.exec(
         select(User).where(User.username == payload.username)
     )
@@ -30,15 +47,31 @@ async def signUp(payload: UserCreate, session: SessionDep):
         logger.warning(f"Sign-up attempt with existing username: {payload.username}")
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    hashed_password = get_password_hash(payload.password)
+    hashed_password = await hasher.hash(payload.password)
     new_user = User(
         username=payload.username,
         password=hashed_password,
     )
 
-    session.add(new_user)
-    await session.commit()
-    await session.refresh(new_user)
+    async with database.directory.write_session() as write_session:
+        write_session.add(new_user)
+        try:
+            await write_session.commit()
+        except IntegrityError:
+            # Taken by a concurrent sign-up while the password was hashed
+            logger.warning(
+                f"Sign-up attempt with existing username: {payload.username}"
+            )
+            raise HTTPException(status_code=400, detail="Username already exists")
+
+    try:
+        await database.create_shard_user(new_user)
+    except Exception:
+        # Without its shard row the account is unusable; free the username
+        async with database.directory.write_session() as write_session:
+            await write_session.execute(delete(User).where(col(User.id) == new_user.id))
+            await write_session.commit()
+        raise
 
     return new_user
 
@@ -46,12 +79,20 @@ async def signUp(payload: UserCreate, session: SessionDep):
 FormDep = Annotated[OAuth2PasswordRequestForm, Depends()]
 
 
-@router.post("/token", response_model=Token)
+@router.post(
+    "/token",
+    response_model=Token,
+    dependencies=[Depends(admit_login)],
+    responses={429: {"description": "Too many sign-in attempts"}},
+)
 async def signIn(
     form_data: FormDep,
-    session: SessionDep,
+    session: DirectoryReadSessionDep,
+    database: DatabaseDep,
     settings: SettingsDep,
+    hasher: PasswordHasherDep,
 ):
+    # A read session: the single writer must not be held while bcrypt runs
     user_result = await session.exec(
         select(User).where(User.username == form_data.username)
     )
@@ -60,12 +101,26 @@ async def signIn(
         logger.warning(f"Sign-in attempt for non-existent user: {form_data.username}")
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    if not verify_password(form_data.password, user.password):
+    valid, new_hash = await hasher.verify_and_update(form_data.password, user.password)
+    if not valid:
         logger.warning(f"Invalid password attempt for user: {form_data.username}")
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # The configured bcrypt cost changed since this hash was created
+    if new_hash:
+        async with database.directory.write_session() as write_session:
+            await write_session.execute(
+                update(User).where(col(User.id) == user.id).values(password=new_hash)
+            )
+            await write_session.commit()
+
     access_token = create_access_token(
-        data=TokenData(sub=user.username),
+        data=TokenData(
+            sub=user.username,
+            uid=user.id,
+            ver=user.token_version,
+            jti=uuid4().hex,
+        ),
         settings=settings,
     )
     return access_token
@@ -74,3 +129,34 @@ async def signIn(
 @router.get("/auth/me", response_model=UserPublic)
 async def me(current_user: CurrentUserDep):
     return current_user
+
+
+@router.post("/auth/sign-out", status_code=204)
+async def signOut(
+    token: TokenDep,
+    current_user: CurrentUserDep,
+    settings: SettingsDep,
+    revocations: TokenRevocationsDep,
+):
+    # Only revokes the token on this worker; use /auth/sign-out-all to revoke
+    # every token of the user across all workers.
+    revocations.revoke(decode_token(token, settings))
+
+
+@router.post("/auth/sign-out-all", status_code=204)
+async def signOutAll(
+    current_user: CurrentUserDep,
+    session: DirectorySessionDep,
+    revocations: TokenRevocationsDep,
+):
+    result = await session.execute(
+        update(User)
+        .where(col(User.id) == current_user.id)
+        .values(token_version=col(User.token_version) + 1)
+        .returning(col(User.token_version))
+    )
+    token_version = result.scalar_one()
+    await session.commit()
+
+    if current_user.id:
+        revocations.set_token_version(current_user.id, token_version)
@@ -0,0 +1,101 @@
+"""
+Server-sent events feed of the current user's task and tag changes.
+
+``GET /changes`` keeps the response open and sends one event per committed
+write (``task.created``, ``task.updated``, ``task.deleted``, ``tag.created``,
+``tag.updated``, ``tag.deleted``), with the ids of the rows in ``data``, plus
+a keep-alive comment every ``change_feed.heartbeat_seconds``. Events only say
+what changed; clients fetch the rows with ``GET /sync``, which is also how
+they catch up after a ``resync`` event or a reconnect.
+
+SSE rather than a WebSocket: the feed is one-way, and a plain GET goes
+through the usual bearer authentication, proxies and metrics.
+"""
+
+import json
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+from app.internal.core.changes import ChangeFeed, ChangeHub, ChangeHubDep, Message
+from app.internal.core.metrics import MetricsRoute
+from app.internal.core.security import CurrentUserDep, TokenDep, decode_token
+from app.internal.core.settings import SettingsDep
+
+router = APIRouter(tags=["sync"], route_class=MetricsRoute)
+
+# How long EventSource clients wait before reconnecting, in milliseconds
+RECONNECT_DELAY_MS = 3000
+
+
+def format_event(message: Message) -> str:
+    if message is None:
+        return ": heartbeat\n\n"
+    event, data = message
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class ChangeStreamResponse(StreamingResponse):
+    """
+    Gives the feed back to the hub however the response ends. A ``finally``
+    in the body generator is not enough: when the client disconnects before
+    the first chunk, the generator never starts and the feed would count
+    against the user's connections for good.
+    """
+
+    def __init__(self, hub: ChangeHub, feed: ChangeFeed, content, **kwargs):
+        super().__init__(content, **kwargs)
+        self.hub = hub
+        self.feed = feed
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.hub.unsubscribe(self.feed)
+
+
+@router.get(
+    "/changes",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        429: {"description": "Too many open change feeds"},
+    },
+)
+async def stream_changes(
+    token: TokenDep,
+    current_user: CurrentUserDep,
+    settings: SettingsDep,
+    hub: ChangeHubDep,
+):
+    """
+    Stream the current user's changes as server-sent events.
+
+    The stream ends when the access token expires; the client reconnects
+    with a new one.
+    """
+    if not current_user.id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    expires_at = decode_token(token, settings).exp
+    feed = hub.subscribe(current_user.id)
+
+    async def events():
+        # Sent right away, so that the client and proxies see the stream
+        yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+        async for message in feed:
+            # Heartbeats make sure this is checked on idle streams too
+            if expires_at and datetime.now(timezone.utc) >= expires_at:
+                return
+            yield format_event(message)
+
+    return ChangeStreamResponse(
+        hub,
+        feed,
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,252 @@
+"""
+Delta sync of the user's tasks and tags.
+
+Every change to a task or tag stamps the row with a change sequence (the
+``data_version`` its write commits, see the ``sync_*`` triggers) and every
+delete leaves a tombstone with one. ``GET /sync?since=<cursor>`` returns the
+rows and tombstones stamped after the cursor, ordered by change sequence, and
+the cursor to pass next time. A client that is up to date gets an empty page
+(or a 304 when it sends the ETag back) for the cost of an index lookup.
+
+A full sync (no ``since``) only returns live rows: the tombstones of rows
+deleted before it started are of no use to a client that never had them.
+Its cursors carry the version it started at, so that rows deleted while it
+is being paged through are still reported.
+
+Tombstones are removed after ``sync.tombstone_retention_days`` by
+``app.commands.prune_tombstones``. A cursor that may still need a removed one
+gets a 410, and the client starts over with a full sync.
+
+Reader connections don't hold a snapshot across statements, so the user's
+``data_version`` is read first and only changes stamped up to it are
+returned: a change committed meanwhile has a higher sequence, and is left
+for the next call rather than split across the queries of this one.
+"""
+
+import base64
+import binascii
+from typing import Annotated, Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import and_, literal, tuple_
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.core.etag import check_etag
+from app.internal.core.metrics import MetricsRoute
+from app.internal.core.security import CurrentUserDep
+from app.internal.core.serialization import FastJSONResponse, dump_tag
+from app.internal.core.sessions import SessionDep
+from app.internal.core.settings import SettingsDep
+from app.internal.models import Tag, Task, TaskTagLink, Tombstone, User
+from app.internal.models.sync import SyncPage
+
+router = APIRouter(tags=["sync"], route_class=MetricsRoute)
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+# Order of the changes sharing a change sequence. Tombstones come first, so
+# that a row deleted and created again under the same id ends up existing.
+TOMBSTONE, TAG, TASK = range(3)
+
+# (change_seq, kind, id) of the last change returned
+Cursor = tuple[int, int, int]
+
+
+def encode_sync_cursor(cursor: Cursor, tombstones_after: int = 0) -> str:
+    values = [*cursor, tombstones_after] if tombstones_after else cursor
+    return base64.urlsafe_b64encode(":".join(map(str, values)).encode()).decode()
+
+
+def decode_sync_cursor(since: str) -> tuple[Cursor, int]:
+    """Return the cursor and the change sequence tombstones must be above."""
+    try:
+        values = [int(value) for value in base64.urlsafe_b64decode(since).split(b":")]
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if len(values) not in (3, 4):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    change_seq, kind, row_id, *rest = values
+    return (change_seq, kind, row_id), rest[0] if rest else 0
+
+
+def cursor_expired(cursor: Cursor, tombstones_after: int, pruned_seq: int) -> bool:
+    """Whether tombstones the cursor still needs may have been pruned."""
+    if tombstones_after >= pruned_seq:
+        return False
+    change_seq, kind, _ = cursor
+    return (change_seq, kind) <= (pruned_seq, TOMBSTONE)
+
+
+def changed_between(
+    change_seq: Any, row_id: Any, kind: int, cursor: Cursor, data_version: int
+) -> Any:
+    """
+    Condition selecting the rows of ``kind`` ordered after ``cursor`` and
+    stamped up to ``data_version``.
+    """
+    cursor_seq, cursor_kind, cursor_id = cursor
+    if kind > cursor_kind:
+        after = change_seq >= cursor_seq
+    elif kind < cursor_kind:
+        after = change_seq > cursor_seq
+    else:
+        after = tuple_(change_seq, row_id) > tuple_(
+            literal(cursor_seq), literal(cursor_id)
+        )
+    return and_(after, change_seq <= data_version)
+
+
+async def get_tag_ids(
+    session: AsyncSession, task_ids: list[int]
+) -> dict[int, list[int]]:
+    tag_ids: dict[int, list[int]] = {}
+    if task_ids:
+        result = await session.exec(
+            select(TaskTagLink.task_id, TaskTagLink.tag_id)
+            .where(col(TaskTagLink.task_id).in_(task_ids))
+            .order_by(col(TaskTagLink.tag_id))
+        )
+        for task_id, tag_id in result.all():
+            tag_ids.setdefault(task_id, []).append(tag_id)
+    return tag_ids
+
+
+@router.get(
+    "/sync",
+    response_model=SyncPage,
+    dependencies=[Depends(check_etag)],
+    responses={
+        400: {"description": "Invalid cursor"},
+        410: {"description": "Cursor expired, sync again without since"},
+    },
+)
+async def sync(
+    current_user: CurrentUserDep,
+    session: SessionDep,
+    response: Response,
+    settings: SettingsDep,
+    since: Annotated[
+        str | None,
+        Query(description="Cursor returned by the previous call; omit to start over"),
+    ] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+):
+    """
+    Return up to ``limit`` tasks, tags and deletions changed after ``since``.
+
+    Without ``since`` every task and tag is returned, paged the same way,
+    but not the deletions that happened before.
+    Tasks reference their tags by id; a tag is sent again only when it is
+    renamed. Keep calling with the returned ``cursor`` while ``has_more`` is
+    true. A 410 means deletions the cursor needed were pruned: start over.
+    """
+    user_id = current_user.id
+    version_result = await session.exec(
+        select(User.data_version, User.tombstones_pruned_seq).where(
+            col(User.id) == user_id
+        )
+    )
+    data_version, pruned_seq = version_result.first() or (0, 0)
+
+    if since:
+        cursor, tombstones_after = decode_sync_cursor(since)
+        if cursor_expired(cursor, tombstones_after, pruned_seq):
+            raise HTTPException(
+                status_code=410, detail="Cursor expired, sync again without since"
+            )
+    else:
+        cursor, tombstones_after = (0, TOMBSTONE, 0), data_version
+
+    tombstones: list[Tombstone] = []
+    if tombstones_after < data_version:
+        tombstones_result = await session.exec(
+            select(Tombstone)
+            .where(
+                col(Tombstone.user_id) == user_id,
+                col(Tombstone.change_seq) > tombstones_after,
+                changed_between(
+                    col(Tombstone.change_seq),
+                    col(Tombstone.id),
+                    TOMBSTONE,
+                    cursor,
+                    data_version,
+                ),
+            )
+            .order_by(col(Tombstone.change_seq), col(Tombstone.id))
+            .limit(limit + 1)
+        )
+        tombstones = list(tombstones_result.all())
+    tags_result = await session.exec(
+        select(Tag)
+        .where(
+            Tag.user_id == user_id,
+            changed_between(
+                col(Tag.change_seq), col(Tag.id), TAG, cursor, data_version
+            ),
+        )
+        .order_by(col(Tag.change_seq), col(Tag.id))
+        .limit(limit + 1)
+    )
+    tasks_result = await session.exec(
+        select(Task)
+        .where(
+            Task.user_id == user_id,
+            changed_between(
+                col(Task.change_seq), col(Task.id), TASK, cursor, data_version
+            ),
+        )
+        .order_by(col(Task.change_seq), col(Task.id))
+        .limit(limit + 1)
+    )
+
+    # Rows read from the database always have an id
+    changes: list[tuple[Cursor, Any]] = sorted(
+        [
+            *(((row.change_seq, TOMBSTONE, row.id or 0), row) for row in tombstones),
+            *(((row.change_seq, TAG, row.id or 0), row) for row in tags_result.all()),
+            *(((row.change_seq, TASK, row.id or 0), row) for row in tasks_result.all()),
+        ],
+        key=lambda change: change[0],
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+
+    tags = [row for (_, kind, _), row in changes if kind == TAG]
+    tasks = [row for (_, kind, _), row in changes if kind == TASK]
+    tag_ids = await get_tag_ids(session, [task.id for task in tasks if task.id])
+
+    # A row that exists again (its id was reused) supersedes its tombstone
+    live = {("tag", tag.id) for tag in tags} | {("task", task.id) for task in tasks}
+    deleted: dict[str, list[int]] = {"tasks": [], "tags": []}
+    for (_, kind, _), row in changes:
+        if kind == TOMBSTONE and (row.entity, row.entity_id) not in live:
+            deleted[f"{row.entity}s"].append(row.entity_id)
+
+    if has_more:
+        next_cursor = encode_sync_cursor(changes[-1][0], tombstones_after)
+    else:
+        # Everything stamped up to data_version has been returned, and every
+        # later tombstone is above it
+        next_cursor = encode_sync_cursor((data_version, TASK + 1, 0))
+
+    content = {
+        "tags": [dump_tag(tag) for tag in tags],
+        "tasks": [
+            {
+                "title": task.title,
+                "description": task.description,
+                "done": task.done,
+                "id": task.id,
+                "tag_ids": tag_ids.get(task.id or 0, []),
+            }
+            for task in tasks
+        ],
+        "deleted": deleted,
+        "cursor": next_cursor,
+        "has_more": has_more,
+    }
+    if settings.api.fast_json:
+        return FastJSONResponse(content, headers=response.headers)
+    return content
@@ -1,28 +1,76 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import desc, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlmodel import col, delete, desc, select
 
-from app.internal.core.db import SessionDep
+from app.internal.core.cache import ReadCacheDep
+from app.internal.core.changes import ChangeHubDep
+from app.internal.core.etag import ETagDep, bump_data_version, check_etag
+from app.internal.core.metrics import MetricsRoute
 from app.internal.core.security import CurrentUserDep
-from app.internal.models import Tag
-from app.internal.models.tag import TagCreate, TagPublic, TagUpdate
-
-router = APIRouter(tags=["tags"])
-
+from app.internal.core.serialization import dump_tag_with_counts, json_response
+from app.internal.core.sessions import SessionDep
+from app.internal.core.settings import SettingsDep
+from app.internal.models import Tag, TaskTagLink
+from app.internal.models.tag import (
+    TagCreate,
+    TagPublic,
+    TagPublicWithCounts,
+    TagUpdate,
+)
+
+router = APIRouter(tags=["tags"], route_class=MetricsRoute)
+
+TAG_ORDERINGS = {
+    "id": (desc(Tag.id),),
+    "task_count": (desc(Tag.task_count), desc(Tag.id)),
+    "open_task_count": (desc(Tag.open_task_count), desc(Tag.id)),
+}
+
+
+@router.get(
+    "/tags",
+    response_model=list[TagPublicWithCounts],
+    dependencies=[Depends(check_etag)],
+)
+async def get_all_tags(
+    current_user: CurrentUserDep,
+    session: SessionDep,
+    response: Response,
+    settings: SettingsDep,
+    etag: ETagDep,
+    read_cache: ReadCacheDep,
+    order_by: Annotated[
+        Literal["id", "task_count", "open_task_count"],
+        Query(description="Sort key, highest first"),
+    ] = "id",
+):
+    if cached := read_cache.get(etag):
+        return cached
 
-@router.get("/tags", response_model=list[TagPublic])
-async def get_all_tags(current_user: CurrentUserDep, session: SessionDep):
     result = await session.exec(
-        select(Tag).where(Tag.user_id == current_user.id).order_by(desc(Tag.id))
+        select(Tag)
+        .where(Tag.user_id == current_user.id)
+        .order_by(*TAG_ORDERINGS[order_by])
     )
     tags = result.all()
+
+    if settings.api.fast_json or read_cache.enabled:
+        return read_cache.store(
+            current_user.id,
+            etag,
+            json_response(map(dump_tag_with_counts, tags), response),
+        )
     return tags
 
 
 @router.post("/tags", response_model=TagPublic, status_code=201)
 async def create_tag(
-    payload: TagCreate, current_user: CurrentUserDep, session: SessionDep
+    payload: TagCreate,
+    current_user: CurrentUserDep,
+    session: SessionDep,
+    read_cache: ReadCacheDep,
+    changes: ChangeHubDep,
 ):
     if not current_user.id:
         raise HTTPException(status_code=401, detail="Unauthorized")
@@ -30,43 +78,69 @@ async def create_tag(
     tag_db = Tag(name=payload.name, user_id=current_user.id)
 
     session.add(tag_db)
+    await bump_data_version(session, current_user.id, read_cache)
     await session.commit()
-    await session.refresh(tag_db)
+    changes.publish(current_user.id, "tag.created", [tag_db.id])
 
     return tag_db
 
 
 async def get_my_tag(tag_id: int, current_user: CurrentUserDep, session: SessionDep):
-    result = await session.get(Tag, tag_id)
-    if not result:
-        raise HTTPException(status_code=404, detail="Tag not found")
+    result = await session.exec(
+        select(Tag).where(Tag.id == tag_id, Tag.user_id == current_user.id)
+    )
+    tag = result.first()
+    if tag:
+        return tag
 
-    if result.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="You are not the owner of this tag")
+    # Miss path only: tell a missing tag apart from someone else's
+    owner_result = await session.exec(select(Tag.user_id).where(Tag.id == tag_id))
+    if owner_result.first() is None:
+        raise HTTPException(status_code=404, detail="Tag not found")
 
-    return result
+    raise HTTPException(status_code=403, detail="You are not the owner of this tag")
 
 
 GetMyTagDep = Annotated[Tag, Depends(get_my_tag)]
 
 
-@router.get("/tags/{tag_id}", response_model=TagPublic)
+@router.get(
+    "/tags/{tag_id}",
+    response_model=TagPublicWithCounts,
+    dependencies=[Depends(check_etag)],
+)
 async def get_tag_by_id(tag: GetMyTagDep):
     return tag
 
 
 @router.patch("/tags/{tag_id}", response_model=TagPublic)
-async def update_tag(tag: GetMyTagDep, payload: TagUpdate, session: SessionDep):
+async def update_tag(
+    tag: GetMyTagDep,
+    payload: TagUpdate,
+    session: SessionDep,
+    read_cache: ReadCacheDep,
+    changes: ChangeHubDep,
+):
     tag.sqlmodel_update(payload.model_dump(exclude_unset=True))
 
     session.add(tag)
+    await bump_data_version(session, tag.user_id, read_cache)
     await session.commit()
-    await session.refresh(tag)
+    changes.publish(tag.user_id, "tag.updated", [tag.id])
 
     return tag
 
 
 @router.delete("/tags/{tag_id}", status_code=204)
-async def delete_tag(tag: GetMyTagDep, session: SessionDep):
-    await session.delete(tag)
+async def delete_tag(
+    tag: GetMyTagDep,
+    session: SessionDep,
+    read_cache: ReadCacheDep,
+    changes: ChangeHubDep,
+):
+    # Bulk statements: session.delete() would load every linked task first
+    await session.execute(delete(TaskTagLink).where(col(TaskTagLink.tag_id) == tag.id))
+    await session.execute(delete(Tag).where(col(Tag.id) == tag.id))
+    await bump_data_version(session, tag.user_id, read_cache)
     await session.commit()
+    changes.publish(tag.user_id, "tag.deleted", [tag.id])
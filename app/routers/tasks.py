@@ -1,93 +1,625 @@
+import base64
+import binascii
 import logging
+import re
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import selectinload
-from sqlmodel import col, desc, select
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Response
+from sqlalchemy import ColumnElement, inspect
+from sqlalchemy.orm import joinedload, selectinload
+from sqlmodel import col, delete, desc, select, text, update
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.internal.core.db import SessionDep
+from app.internal.core.cache import ReadCacheDep
+from app.internal.core.changes import ChangeHubDep
+from app.internal.core.db import insert_returning_ids
+from app.internal.core.etag import ETagDep, bump_data_version, check_etag
+from app.internal.core.fieldsets import TaskFieldsetDep
+from app.internal.core.metrics import MetricsRoute
 from app.internal.core.security import CurrentUserDep
-from app.internal.models.tag import Tag
-from app.internal.models.task import Task, TaskCreate, TaskPublic, TaskUpdate
+from app.internal.core.serialization import (
+    FastJSONResponse,
+    dump_tag_with_counts,
+    dump_task,
+    json_response,
+)
+from app.internal.core.sessions import GroupCommitDep, SessionDep
+from app.internal.core.settings import SettingsDep
+from app.internal.core.tagging import (
+    assign_tags,
+    get_owned_tags,
+    insert_links,
+    unlink_tasks,
+)
+from app.internal.models.tag import Tag, TagPublic
+from app.internal.models.task import (
+    Task,
+    TaskBatchResult,
+    TaskBatchUpdate,
+    TaskCreate,
+    TaskPublic,
+    TaskSearchResult,
+    TaskUpdate,
+)
+from app.internal.models.task_stats import TaskStats, TaskStatsPublic
+from app.internal.models.user import User
 
-router = APIRouter(tags=["tasks"])
+router = APIRouter(tags=["tasks"], route_class=MetricsRoute)
 logger = logging.getLogger(__name__)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+MAX_BATCH_SIZE = 100
+# Fields that an update may leave out but not set to null
+NOT_NULL_FIELDS = frozenset(
+    column.key for column in inspect(Task).columns if not column.nullable
+)
+
 
 async def get_task_owner(
-    task_id: int,
+    task_id: int, current_user: User, session: AsyncSession
+) -> Task:
+    """
+    Load a task of the current user with its tags in a single query.
+
+    Only when nothing matches does a second query tell a missing task (404)
+    apart from someone else's (403).
+    """
+    result = await session.exec(
+        select(Task)
+        .options(joinedload(getattr(Task, "tags")))
+        .where(Task.id == task_id, Task.user_id == current_user.id)
+    )
+    task = result.unique().first()
+    if task:
+        return task
+    raise await task_access_error(task_id, current_user, session)
+
+
+async def task_access_error(
+    task_id: int, current_user: User, session: AsyncSession
+) -> HTTPException:
+    """Tell a missing task (404) apart from someone else's (403)."""
+    owner_result = await session.exec(select(Task.user_id).where(Task.id == task_id))
+    if owner_result.first() is None:
+        logger.warning(f"Task not found: {task_id} for user {current_user.username}")
+        return HTTPException(status_code=404, detail="Task not found")
+
+    logger.warning(
+        f"User {current_user.username} attempted to access unowned task {task_id}"
+    )
+    return HTTPException(status_code=403, detail="You are not the owner of this task")
+
+
+@router.get(
+    "/tasks",
+    response_model=list[TaskPublic],
+    dependencies=[Depends(check_etag)],
+    responses={400: {"description": "Unknown field or include"}},
+)
+async def get_all_tasks(
     current_user: CurrentUserDep,
     session: SessionDep,
+    response: Response,
+    settings: SettingsDep,
+    etag: ETagDep,
+    read_cache: ReadCacheDep,
+    fieldset: TaskFieldsetDep,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: Annotated[
+        int | None,
+        Query(description="Return tasks with an id lower than this cursor"),
+    ] = None,
+    done: bool | None = None,
+    title_prefix: Annotated[str | None, Query(min_length=1, max_length=200)] = None,
 ):
-    task = await session.get(Task, task_id)
-    if not task:
-        logger.warning(f"Task not found: {task_id} for user {current_user.username}")
-        raise HTTPException(status_code=404, detail="Task not found")
+    """
+    Return one page of the current user's tasks, newest first.
 
-    if task.user_id != current_user.id:
-        logger.warning(
-            f"User {current_user.username} attempted to access unowned task {task_id}"
-        )
-        raise HTTPException(
-            status_code=403, detail="You are not the owner of this task"
-        )
-    return task
+    Pagination is keyset-based on ``Task.id``: when the page is full, the id to
+    pass as ``cursor`` for the next page is returned in the ``X-Next-Cursor``
+    header. Tags are only preloaded for the tasks of the returned page.
 
+    ``fields`` and ``include`` restrict the response to some columns and
+    relationships (see ``fieldsets.py``).
+    """
+    if cached := read_cache.get(etag):
+        return cached
 
-TaskOwnerDep = Annotated[Task, Depends(get_task_owner)]
+    conditions: list[ColumnElement[bool]] = [col(Task.user_id) == current_user.id]
+    if cursor is not None:
+        conditions.append(col(Task.id) < cursor)
+    if done is not None:
+        conditions.append(col(Task.done) == done)
+    if title_prefix:
+        conditions.append(col(Task.title).startswith(title_prefix, autoescape=True))
 
+    if not fieldset.complete:
+        rows = await fieldset.load(
+            session,
+            fieldset.select().where(*conditions).order_by(desc(Task.id)).limit(limit),
+        )
+        if len(rows) == limit:
+            response.headers["X-Next-Cursor"] = str(rows[-1]["id"])
+        return read_cache.store(
+            current_user.id,
+            etag,
+            fieldset.render(
+                rows, response, settings.api.fast_json or read_cache.enabled
+            ),
+        )
 
-@router.get("/tasks", response_model=list[TaskPublic])
-async def get_all_tasks(current_user: CurrentUserDep, session: SessionDep):
+    statement = select(Task).where(*conditions)
     result = await session.exec(
-        select(Task)
-        .options(selectinload(getattr(Task, "tags")))
-        .where(Task.user_id == current_user.id)
+        statement.options(selectinload(getattr(Task, "tags")))
         .order_by(desc(Task.id))
+        .limit(limit)
     )
     tasks = result.all()
+    if len(tasks) == limit:
+        response.headers["X-Next-Cursor"] = str(tasks[-1].id)
+
+    if settings.api.fast_json or read_cache.enabled:
+        return read_cache.store(
+            current_user.id, etag, json_response(map(dump_task, tasks), response)
+        )
     return tasks
 
 
+SEARCH_TOKEN_PATTERN = re.compile(r"\w+")
+SEARCH_STATEMENT = text(
+    """
+    SELECT
+        tasks.id,
+        bm25(tasks_fts) AS rank,
+        snippet(tasks_fts, -1, '<mark>', '</mark>', '…', 12) AS snippet
+    FROM tasks_fts
+    JOIN tasks ON tasks.id = tasks_fts.rowid
+    WHERE tasks_fts MATCH :query
+        AND tasks.user_id = :user_id
+        AND (
+            :after_rank IS NULL
+            OR bm25(tasks_fts) > :after_rank
+            OR (bm25(tasks_fts) = :after_rank AND tasks.id < :after_id)
+        )
+    ORDER BY rank, tasks.id DESC
+    LIMIT :limit
+    """
+)
+
+
+def build_fts_query(q: str) -> str | None:
+    """
+    Turn free text into an FTS5 query matching every word.
+
+    Each word is quoted so that FTS5 operators in user input are taken
+    literally, and the last word is matched as a prefix.
+    """
+    tokens = SEARCH_TOKEN_PATTERN.findall(q)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"' for token in tokens) + "*"
+
+
+def encode_search_cursor(rank: float, task_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{rank!r}:{task_id}".encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    try:
+        rank, task_id = base64.urlsafe_b64decode(cursor).decode().split(":")
+        return float(rank), int(task_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+@router.get(
+    "/tasks/search",
+    response_model=list[TaskSearchResult],
+    dependencies=[Depends(check_etag)],
+)
+async def search_tasks(
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    current_user: CurrentUserDep,
+    session: SessionDep,
+    response: Response,
+    settings: SettingsDep,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+):
+    """
+    Full-text search over the title and description of the user's tasks.
+
+    Results are ordered by bm25 relevance and paginated with an opaque keyset
+    cursor, returned in the ``X-Next-Cursor`` header when the page is full.
+    """
+    query = build_fts_query(q)
+    if query is None:
+        return []
+
+    after_rank, after_id = decode_search_cursor(cursor) if cursor else (None, None)
+    result = await session.execute(
+        SEARCH_STATEMENT,
+        params={
+            "query": query,
+            "user_id": current_user.id,
+            "after_rank": after_rank,
+            "after_id": after_id,
+            "limit": limit,
+        },
+    )
+    hits = result.all()
+    if not hits:
+        return []
+
+    tasks_result = await session.exec(
+        select(Task)
+        .options(selectinload(getattr(Task, "tags")))
+        .where(col(Task.id).in_([hit.id for hit in hits]))
+    )
+    tasks = {task.id: task for task in tasks_result.all()}
+
+    if len(hits) == limit:
+        response.headers["X-Next-Cursor"] = encode_search_cursor(
+            hits[-1].rank, hits[-1].id
+        )
+    hits = [hit for hit in hits if hit.id in tasks]
+
+    if settings.api.fast_json:
+        return json_response(
+            (
+                {**dump_task(tasks[hit.id]), "rank": hit.rank, "snippet": hit.snippet}
+                for hit in hits
+            ),
+            response,
+        )
+    return [
+        TaskSearchResult.model_validate(
+            tasks[hit.id], update={"rank": hit.rank, "snippet": hit.snippet}
+        )
+        for hit in hits
+    ]
+
+
+@router.get(
+    "/tasks/stats",
+    response_model=TaskStatsPublic,
+    dependencies=[Depends(check_etag)],
+)
+async def get_task_stats(
+    current_user: CurrentUserDep,
+    session: SessionDep,
+    response: Response,
+    settings: SettingsDep,
+    etag: ETagDep,
+    read_cache: ReadCacheDep,
+):
+    """
+    Task totals and per-tag counts, most used tags first.
+
+    Everything is read from counters that database triggers keep up to date
+    (``task_stats`` and the tag counts), so the cost doesn't grow with the
+    number of tasks.
+    """
+    if cached := read_cache.get(etag):
+        return cached
+
+    stats = await session.get(TaskStats, current_user.id) or TaskStats(
+        user_id=current_user.id
+    )
+    tags_result = await session.exec(
+        select(Tag)
+        .where(Tag.user_id == current_user.id)
+        .order_by(desc(Tag.task_count), desc(Tag.id))
+    )
+    content = {
+        "task_count": stats.task_count,
+        "done_task_count": stats.done_task_count,
+        "open_task_count": stats.task_count - stats.done_task_count,
+        "untagged_task_count": stats.untagged_task_count,
+        "tags": [dump_tag_with_counts(tag) for tag in tags_result.all()],
+    }
+
+    if settings.api.fast_json or read_cache.enabled:
+        return read_cache.store(
+            current_user.id,
+            etag,
+            FastJSONResponse(content, headers=response.headers),
+        )
+    return content
+
+
 @router.post("/tasks", response_model=TaskPublic, status_code=201)
 async def create_task(
-    payload: TaskCreate, current_user: CurrentUserDep, session: SessionDep
+    payload: TaskCreate,
+    current_user: CurrentUserDep,
+    group_commit: GroupCommitDep,
+    read_cache: ReadCacheDep,
+    changes: ChangeHubDep,
 ):
-    if not current_user.id:
+    user_id = current_user.id
+    if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    tag_ids = payload.tag_ids
-    tags: list[Tag] = []
-    if tag_ids:
-        tag_result = await session.exec(select(Tag).where(col(Tag.id).in_(tag_ids)))
-        tags = list(tag_result.all())
-        if len(tags) != len(tag_ids):
+    async def write(session: AsyncSession) -> TaskPublic:
+        tags = await get_owned_tags(session, user_id, payload.tag_ids)
+        if len(tags) != len(set(payload.tag_ids)):
             raise HTTPException(status_code=404, detail="One or more tags not found")
 
-    task_db = Task(
-        title=payload.title,
-        description=payload.description,
-        user_id=current_user.id,
-        tags=tags,
+        task_db = Task(
+            title=payload.title,
+            description=payload.description,
+            user_id=user_id,
+        )
+
+        session.add(task_db)
+        await session.flush()
+        if task_db.id:
+            await insert_links(session, ((task_db.id, tag_id) for tag_id in tags))
+        await bump_data_version(session, user_id, read_cache)
+
+        return TaskPublic(
+            **task_db.model_dump(),
+            tags=[TagPublic(id=tag_id, name=name) for tag_id, name in tags.items()],
+        )
+
+    task = await group_commit.run(write)
+    changes.publish(user_id, "task.created", [task.id])
+    return task
+
+
+async def get_task_owners(session: SessionDep, task_ids: list[int]) -> dict[int, int]:
+    result = await session.exec(
+        select(Task.id, Task.user_id).where(col(Task.id).in_(task_ids))
+    )
+    return {task_id: user_id for task_id, user_id in result.all() if task_id}
+
+
+def check_batch_ownership(
+    task_ids: list[int], owners: dict[int, int], user_id: int | None
+) -> dict[int, TaskBatchResult]:
+    """Return the per-item errors of a batch targeting existing tasks."""
+    errors: dict[int, TaskBatchResult] = {}
+    seen: set[int] = set()
+    for index, task_id in enumerate(task_ids):
+        if task_id in seen:
+            errors[index] = TaskBatchResult(
+                index=index, id=task_id, status=400, detail="Duplicate task id"
+            )
+        elif task_id not in owners:
+            errors[index] = TaskBatchResult(
+                index=index, id=task_id, status=404, detail="Task not found"
+            )
+        elif owners[task_id] != user_id:
+            errors[index] = TaskBatchResult(
+                index=index,
+                id=task_id,
+                status=403,
+                detail="You are not the owner of this task",
+            )
+        seen.add(task_id)
+    return errors
+
+
+@router.post("/tasks/batch", response_model=list[TaskBatchResult])
+async def create_tasks_batch(
+    payload: Annotated[list[TaskCreate], Body(min_length=1, max_length=MAX_BATCH_SIZE)],
+    current_user: CurrentUserDep,
+    session: SessionDep,
+    read_cache: ReadCacheDep,
+    changes: ChangeHubDep,
+):
+    """
+    Create up to ``MAX_BATCH_SIZE`` tasks in one transaction.
+
+    Items referencing tags the user doesn't own are reported as 404 and
+    skipped; the others are inserted with a single multi-row INSERT.
+    """
+    if not current_user.id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    owned_tags = await get_owned_tags(
+        session,
+        current_user.id,
+        {tag_id for item in payload for tag_id in item.tag_ids},
+    )
+
+    results: dict[int, TaskBatchResult] = {}
+    accepted: list[tuple[int, TaskCreate]] = []
+    for index, item in enumerate(payload):
+        if not owned_tags.keys() >= set(item.tag_ids):
+            results[index] = TaskBatchResult(
+                index=index, status=404, detail="One or more tags not found"
+            )
+        else:
+            accepted.append((index, item))
+
+    if accepted:
+        task_ids = await insert_returning_ids(
+            session,
+            Task,
+            [
+                {
+                    "title": item.title,
+                    "description": item.description,
+                    "done": item.done,
+                    "user_id": current_user.id,
+                }
+                for _, item in accepted
+            ],
+        )
+
+        await insert_links(
+            session,
+            (
+                (task_id, tag_id)
+                for task_id, (_, item) in zip(task_ids, accepted)
+                for tag_id in set(item.tag_ids)
+            ),
+        )
+        await bump_data_version(session, current_user.id, read_cache)
+        await session.commit()
+        changes.publish(current_user.id, "task.created", task_ids)
+
+        for task_id, (index, _) in zip(task_ids, accepted):
+            results[index] = TaskBatchResult(index=index, id=task_id, status=201)
+
+    return [results[index] for index in range(len(payload))]
+
+
+@router.patch("/tasks/batch", response_model=list[TaskBatchResult])
+async def update_tasks_batch(
+    payload: Annotated[
+        list[TaskBatchUpdate], Body(min_length=1, max_length=MAX_BATCH_SIZE)
+    ],
+    current_user: CurrentUserDep,
+    session: SessionDep,
+    read_cache: ReadCacheDep,
+    changes: ChangeHubDep,
+):
+    """
+    Update up to ``MAX_BATCH_SIZE`` tasks in one transaction.
+
+    Only the fields set on each item are written. When ``tag_ids`` is set, the
+    task's tags are changed to exactly that set, writing only the difference.
+    Items setting ``title`` or ``done`` to null are skipped with a 400.
+    """
+    if not current_user.id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    task_ids = [item.id for item in payload]
+    owners = await get_task_owners(session, task_ids)
+    results = check_batch_ownership(task_ids, owners, current_user.id)
+    for index, item in enumerate(payload):
+        nulls = sorted(
+            name
+            for name in NOT_NULL_FIELDS & item.model_fields_set
+            if getattr(item, name) is None
+        )
+        if nulls and index not in results:
+            results[index] = TaskBatchResult(
+                index=index,
+                id=item.id,
+                status=400,
+                detail=f"Fields cannot be null: {', '.join(nulls)}",
+            )
+
+    valid = [
+        (index, item) for index, item in enumerate(payload) if index not in results
+    ]
+    assignment = await assign_tags(
+        session,
+        current_user.id,
+        {
+            item.id: set(item.tag_ids)
+            for _, item in valid
+            if "tag_ids" in item.model_fields_set
+        },
     )
 
-    session.add(task_db)
-    await session.commit()
-    await session.refresh(task_db)
+    rows: list[dict] = []
+    for index, item in valid:
+        if item.id in assignment.rejected:
+            results[index] = TaskBatchResult(
+                index=index, id=item.id, status=404, detail="One or more tags not found"
+            )
+            continue
+
+        fields = item.model_dump(exclude_unset=True, exclude={"id", "tag_ids"})
+        if fields:
+            rows.append({"id": item.id, **fields})
+        results[index] = TaskBatchResult(index=index, id=item.id, status=200)
+
+    if rows:
+        # ORM bulk UPDATE by primary key, grouped by the set of changed fields
+        await session.execute(update(Task), params=rows)
+    if rows or assignment.added or assignment.removed:
+        await bump_data_version(session, current_user.id, read_cache)
+        await session.commit()
+        changes.publish(
+            current_user.id,
+            "task.updated",
+            [item.id for index, item in valid if results[index].status == 200],
+        )
+
+    return [results[index] for index in range(len(payload))]
 
-    return task_db
+
+@router.delete("/tasks/batch", response_model=list[TaskBatchResult])
+async def delete_tasks_batch(
+    ids: Annotated[list[int], Query(min_length=1, max_length=MAX_BATCH_SIZE)],
+    current_user: CurrentUserDep,
+    session: SessionDep,
+    read_cache: ReadCacheDep,
+    changes: ChangeHubDep,
+):
+    """Delete up to ``MAX_BATCH_SIZE`` tasks (and their tag links) at once."""
+    owners = await get_task_owners(session, ids)
+    results = check_batch_ownership(ids, owners, current_user.id)
+
+    deleted = [task_id for index, task_id in enumerate(ids) if index not in results]
+    if deleted:
+        await unlink_tasks(session, deleted)
+        await session.execute(delete(Task).where(col(Task.id).in_(deleted)))
+        await bump_data_version(session, current_user.id, read_cache)
+        await session.commit()
+        changes.publish(current_user.id, "task.deleted", deleted)
+
+    for index, task_id in enumerate(ids):
+        if index not in results:
+            results[index] = TaskBatchResult(index=index, id=task_id, status=204)
+
+    return [results[index] for index in range(len(ids))]
 
 
 @router.get(
     "/tasks/{task_id}",
     response_model=TaskPublic,
+    dependencies=[Depends(check_etag)],
     responses={
+        400: {"description": "Unknown field or include"},
         404: {"description": "Task not found"},
         403: {"description": "You are not the owner of this task"},
     },
 )
-async def get_task_by_id(task_owner: TaskOwnerDep):
-    return task_owner
+async def get_task_by_id(
+    task_id: int,
+    current_user: CurrentUserDep,
+    session: SessionDep,
+    response: Response,
+    settings: SettingsDep,
+    etag: ETagDep,
+    read_cache: ReadCacheDep,
+    fieldset: TaskFieldsetDep,
+):
+    if cached := read_cache.get(etag):
+        return cached
+
+    if not fieldset.complete:
+        rows = await fieldset.load(
+            session,
+            fieldset.select().where(
+                col(Task.id) == task_id, col(Task.user_id) == current_user.id
+            ),
+        )
+        if not rows:
+            raise await task_access_error(task_id, current_user, session)
+        return read_cache.store(
+            current_user.id,
+            etag,
+            fieldset.render(
+                rows[0], response, settings.api.fast_json or read_cache.enabled
+            ),
+        )
+
+    task = await get_task_owner(task_id, current_user, session)
+    if read_cache.enabled:
+        return read_cache.store(
+            current_user.id,
+            etag,
+            FastJSONResponse(dump_task(task), headers=response.headers),
+        )
+    return task
 
 
 @router.patch(
@@ -99,17 +631,42 @@ async def get_task_by_id(task_owner: TaskOwnerDep):
     },
 )
 async def update_task(
-    task: TaskOwnerDep,
+    task_id: int,
     payload: TaskUpdate,
-    session: SessionDep,
+    current_user: CurrentUserDep,
+    group_commit: GroupCommitDep,
+    read_cache: ReadCacheDep,
+    changes: ChangeHubDep,
 ):
-    task_data = payload.model_dump(exclude_unset=True)
-    task.sqlmodel_update(task_data)
+    async def write(session: AsyncSession) -> TaskPublic:
+        task = await get_task_owner(task_id, current_user, session)
+
+        tags = None
+        if "tag_ids" in payload.model_fields_set and task.id:
+            assignment = await assign_tags(
+                session, task.user_id, {task.id: set(payload.tag_ids)}
+            )
+            if assignment.rejected:
+                raise HTTPException(
+                    status_code=404, detail="One or more tags not found"
+                )
+            tags = [
+                TagPublic(id=tag_id, name=name)
+                for tag_id, name in assignment.tags.items()
+            ]
+
+        task_data = payload.model_dump(exclude_unset=True, exclude={"tag_ids"})
+        task.sqlmodel_update(task_data)
+
+        session.add(task)
+        await bump_data_version(session, task.user_id, read_cache)
 
-    session.add(task)
-    await session.commit()
-    await session.refresh(task)
+        if tags is not None:
+            return TaskPublic.model_validate(task, update={"tags": tags})
+        return TaskPublic.model_validate(task)
 
+    task = await group_commit.run(write)
+    changes.publish(current_user.id, "task.updated", [task.id])
     return task
 
 
@@ -121,6 +678,18 @@ async def update_task(
     },
     status_code=204,
 )
-async def delete_task(task: TaskOwnerDep, session: SessionDep):
-    await session.delete(task)
-    await session.commit()
+async def delete_task(
+    task_id: int,
+    current_user: CurrentUserDep,
+    group_commit: GroupCommitDep,
+    read_cache: ReadCacheDep,
+    changes: ChangeHubDep,
+):
+    async def write(session: AsyncSession) -> None:
+        task = await get_task_owner(task_id, current_user, session)
+        await unlink_tasks(session, [task_id])
+        await session.execute(delete(Task).where(col(Task.id) == task_id))
+        await bump_data_version(session, task.user_id, read_cache)
+
+    await group_commit.run(write)
+    changes.publish(current_user.id, "task.deleted", [task_id])
@@ -0,0 +1,366 @@
+import codecs
+import csv
+import io
+import json
+import time
+from typing import Annotated, AsyncGenerator, AsyncIterator, Literal
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlmodel import col, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.core.cache import ReadCache, ReadCacheDep
+from app.internal.core.changes import ChangeHub, ChangeHubDep
+from app.internal.core.db import DatabaseDep, SqliteDatabase, insert_returning_ids
+from app.internal.core.etag import bump_data_version
+from app.internal.core.metrics import MetricsRoute
+from app.internal.core.security import CurrentUserDep
+from app.internal.core.sessions import SessionDep
+from app.internal.core.tagging import get_tags_by_task, insert_links
+from app.internal.models.tag import Tag
+from app.internal.models.task import (
+    Task,
+    TaskImport,
+    TaskImportError,
+    TaskImportReport,
+)
+
+router = APIRouter(tags=["tasks"], route_class=MetricsRoute)
+
+EXPORT_CHUNK_SIZE = 500
+IMPORT_CHUNK_SIZE = 1000
+# Only the first errors are reported, the rest are only counted
+MAX_IMPORT_ERRORS = 100
+CSV_COLUMNS = ("id", "title", "description", "done", "tags")
+# Tag names are joined with this separator in the CSV "tags" column; use NDJSON
+# for a lossless export when tag names may contain it.
+CSV_TAG_SEPARATOR = "|"
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES: dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+async def stream_tasks(
+    database: SqliteDatabase, user_id: int, export_format: ExportFormat
+) -> AsyncGenerator[str, None]:
+    """
+    Yield the user's tasks, one chunk of ``EXPORT_CHUNK_SIZE`` at a time.
+
+    Tasks are read in keyset pages by id, each page (and its tags) with a
+    read session of its own that is closed before the chunk is sent. A slow
+    download therefore never holds a reader connection or a read snapshot
+    (which would keep the WAL from being checkpointed) while it waits on the
+    client, and memory use doesn't grow with the number of tasks. Tasks
+    created or deleted during the export may or may not be part of it.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if export_format == "csv":
+        writer.writerow(CSV_COLUMNS)
+
+    last_id = 0
+    while True:
+        async with database.read_session() as session:
+            result = await session.exec(
+                select(Task.id, Task.title, Task.description, Task.done)
+                .where(col(Task.user_id) == user_id, col(Task.id) > last_id)
+                .order_by(col(Task.id))
+                .limit(EXPORT_CHUNK_SIZE)
+            )
+            rows = result.all()
+            tags_by_task = await get_tags_by_task(
+                session, [task_id for task_id, *_ in rows if task_id is not None]
+            )
+
+        for task_id, title, description, done in rows:
+            tags = tags_by_task.get(task_id or 0, [])
+            if export_format == "csv":
+                writer.writerow(
+                    (
+                        task_id,
+                        title,
+                        description or "",
+                        "true" if done else "false",
+                        CSV_TAG_SEPARATOR.join(tag["name"] for tag in tags),
+                    )
+                )
+            else:
+                buffer.write(
+                    json.dumps(
+                        {
+                            "id": task_id,
+                            "title": title,
+                            "description": description,
+                            "done": done,
+                            "tags": tags,
+                        }
+                    )
+                )
+                buffer.write("\n")
+
+        if buffer.tell():
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if len(rows) < EXPORT_CHUNK_SIZE:
+            return
+        last_id = rows[-1][0] or 0
+
+
+@router.get(
+    "/tasks/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "description": "All of the user's tasks with their tags",
+            "content": {media_type: {} for media_type in MEDIA_TYPES.values()},
+        }
+    },
+)
+async def export_tasks(
+    current_user: CurrentUserDep,
+    database: DatabaseDep,
+    format: Annotated[ExportFormat, Query()] = "ndjson",
+):
+    if not current_user.id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    return StreamingResponse(
+        stream_tasks(database.shard_for(current_user.id), current_user.id, format),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+
+async def iter_lines(stream: AsyncIterator[bytes]) -> AsyncGenerator[str, None]:
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in stream:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.removesuffix("\r")
+
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.removesuffix("\r")
+
+
+async def iter_ndjson_rows(
+    lines: AsyncIterator[str],
+) -> AsyncGenerator[dict | str, None]:
+    """Yield each non-empty line as a dict, or an error message."""
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield f"Invalid JSON: {exc.msg}"
+            continue
+        yield row if isinstance(row, dict) else "Expected a JSON object"
+
+
+async def iter_csv_rows(lines: AsyncIterator[str]) -> AsyncGenerator[dict, None]:
+    """
+    Yield each CSV record as a dict keyed by the header row.
+
+    A quoted field may span lines; since quotes inside a field are doubled, a
+    record is complete once it contains an even number of quote characters.
+    """
+    header: list[str] | None = None
+    record: list[str] = []
+    quotes = 0
+    async for line in lines:
+        record.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+
+        values = next(csv.reader(["\n".join(record)]), [])
+        record, quotes = [], 0
+        if not values:
+            continue
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+
+        row: dict = dict(zip(header, values))
+        if "description" in row and not row["description"]:
+            row["description"] = None
+        if "done" in row and not row["done"]:
+            del row["done"]
+        row["tags"] = [
+            name for name in row.get("tags", "").split(CSV_TAG_SEPARATOR) if name
+        ]
+        yield row
+
+
+def format_validation_error(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+class TaskImporter:
+    """Insert validated rows in chunks, creating missing tags by name."""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        user_id: int,
+        read_cache: ReadCache,
+        changes: ChangeHub,
+    ):
+        self.session = session
+        self.user_id = user_id
+        self.read_cache = read_cache
+        self.changes = changes
+        self.tag_ids: dict[str, int] = {}
+        # Created in the chunk being imported, published once it is committed
+        self.new_tag_ids: list[int] = []
+        self.tags_created = 0
+        self.rows_imported = 0
+
+    async def resolve_tags(self, names: set[str]) -> None:
+        names -= self.tag_ids.keys()
+        if not names:
+            return
+
+        result = await self.session.exec(
+            select(Tag.id, Tag.name)
+            .where(Tag.user_id == self.user_id, col(Tag.name).in_(names))
+            .order_by(col(Tag.id).desc())
+        )
+        # Descending order so that the oldest tag wins on duplicate names
+        self.tag_ids.update(
+            {name: tag_id for tag_id, name in result.all() if tag_id is not None}
+        )
+
+        missing = sorted(names - self.tag_ids.keys())
+        if missing:
+            inserted = await self.session.execute(
+                insert(Tag).returning(col(Tag.id), col(Tag.name)),
+                params=[{"name": name, "user_id": self.user_id} for name in missing],
+            )
+            created: dict[str, int] = {name: tag_id for tag_id, name in inserted.all()}
+            self.tag_ids.update(created)
+            self.new_tag_ids.extend(created.values())
+            self.tags_created += len(missing)
+
+    async def flush(self, rows: list[TaskImport]) -> None:
+        """Insert one chunk of rows and their tag links in a transaction."""
+        if not rows:
+            return
+
+        await self.resolve_tags({name for row in rows for name in row.tags})
+
+        task_ids = await insert_returning_ids(
+            self.session,
+            Task,
+            [
+                {
+                    "title": row.title,
+                    "description": row.description,
+                    "done": row.done,
+                    "user_id": self.user_id,
+                }
+                for row in rows
+            ],
+        )
+        await insert_links(
+            self.session,
+            (
+                (task_id, self.tag_ids[name])
+                for task_id, row in zip(task_ids, rows)
+                for name in set(row.tags)
+            ),
+        )
+
+        await bump_data_version(self.session, self.user_id, self.read_cache)
+        await self.session.commit()
+        self.rows_imported += len(rows)
+
+        if self.new_tag_ids:
+            self.changes.publish(self.user_id, "tag.created", self.new_tag_ids)
+            self.new_tag_ids = []
+        self.changes.publish(self.user_id, "task.created", task_ids)
+
+
+@router.post(
+    "/tasks/import",
+    response_model=TaskImportReport,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {media_type: {} for media_type in MEDIA_TYPES.values()},
+        }
+    },
+)
+async def import_tasks(
+    request: Request,
+    current_user: CurrentUserDep,
+    session: SessionDep,
+    read_cache: ReadCacheDep,
+    changes: ChangeHubDep,
+    format: Annotated[ExportFormat, Query()] = "ndjson",
+):
+    """
+    Import tasks from an NDJSON or CSV request body.
+
+    The body is parsed as it arrives and rows are inserted every
+    ``IMPORT_CHUNK_SIZE`` rows, each chunk in its own transaction, so a failed
+    row never rolls back the others. The accepted columns/keys are those of
+    ``GET /tasks/export``; ``id`` is ignored and unknown tags are created.
+    """
+    if not current_user.id:
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    started = time.perf_counter()
+    importer = TaskImporter(session, current_user.id, read_cache, changes)
+    errors: list[TaskImportError] = []
+    rows_total = rows_failed = 0
+    chunk: list[TaskImport] = []
+
+    lines = iter_lines(request.stream())
+    rows = iter_csv_rows(lines) if format == "csv" else iter_ndjson_rows(lines)
+    async for raw_row in rows:
+        rows_total += 1
+        try:
+            if isinstance(raw_row, str):
+                raise ValueError(raw_row)
+            chunk.append(TaskImport.model_validate(raw_row))
+        except (ValidationError, ValueError) as exc:
+            rows_failed += 1
+            if len(errors) < MAX_IMPORT_ERRORS:
+                detail = (
+                    format_validation_error(exc)
+                    if isinstance(exc, ValidationError)
+                    else str(exc)
+                )
+                errors.append(TaskImportError(row=rows_total, detail=detail))
+            continue
+
+        if len(chunk) >= IMPORT_CHUNK_SIZE:
+            await importer.flush(chunk)
+            chunk = []
+
+    await importer.flush(chunk)
+
+    elapsed = time.perf_counter() - started
+    return TaskImportReport(
+        rows_total=rows_total,
+        rows_imported=importer.rows_imported,
+        rows_failed=rows_failed,
+        tags_created=importer.tags_created,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(importer.rows_imported / elapsed, 1) if elapsed else 0,
+        errors=errors,
+    )
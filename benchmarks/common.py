@@ -0,0 +1,115 @@
+"""
+Helpers shared by the benchmark scripts.
+
+The application reads ``config.yaml`` from the working directory the first
+time ``app.internal.core.settings.get_settings()`` is called (``create_app``
+does it), so ``prepare_workspace`` must run before the app is created.
+"""
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CONFIG: dict[str, Any] = {
+    "database": {"sqlite": {}},
+    "jwt": {"secret_key": "benchmark-secret-key-not-for-production-use"},
+    # Every virtual user signs in from the same in-process client address
+    "login_throttle": {"enabled": False},
+}
+
+
+def parse_override(value: str) -> tuple[list[str], Any]:
+    """Parse ``--set section.key=value``; the value is read as YAML."""
+    path, _, raw = value.partition("=")
+    return path.split("."), yaml.safe_load(raw)
+
+
+def prepare_workspace(
+    base_config: Path | None, overrides: list[tuple[list[str], Any]]
+) -> Path:
+    """
+    Create a temporary directory holding ``config.yaml`` and an empty database
+    path, and make it the working directory. Returns the database file path.
+    """
+    workdir = Path(tempfile.mkdtemp(prefix="fastapi-todo-bench-"))
+    config = yaml.safe_load(base_config.read_text()) if base_config else {}
+    config = {**DEFAULT_CONFIG, **(config or {})}
+
+    db_path = workdir / "benchmark.db"
+    for path, value in [(["database", "sqlite", "file_name"], str(db_path))] + list(
+        overrides
+    ):
+        section = config
+        for key in path[:-1]:
+            section = section.setdefault(key, {})
+        section[path[-1]] = value
+
+    (workdir / "config.yaml").write_text(yaml.safe_dump(config))
+    os.chdir(workdir)
+    return db_path
+
+
+def migrate(db_path: Path) -> None:
+    """Create the schema (triggers and FTS table included) with Alembic."""
+    from alembic.config import Config
+
+    from alembic import command
+
+    config = Config(str(REPO_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(REPO_ROOT / "alembic"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{db_path}")
+    command.upgrade(config, "head")
+
+
+def summarize(latencies: list[float], elapsed: float) -> dict[str, float | int]:
+    """Throughput and latency percentiles (in milliseconds) of one route."""
+    if not latencies:
+        return {"count": 0}
+
+    ms = sorted(latency * 1000 for latency in latencies)
+    if len(ms) > 1:
+        cuts = statistics.quantiles(ms, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = ms[0]
+    return {
+        "count": len(ms),
+        "rps": round(len(ms) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+def environment() -> dict[str, str | None]:
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "git_revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def write_results(results: dict[str, Any], output: Path | None) -> None:
+    if output:
+        output.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"\nResults written to {output}")
@@ -0,0 +1,67 @@
+"""
+Compare two JSON results written by ``benchmarks.load``, ``benchmarks.micro``
+or ``benchmarks.startup``.
+
+Usage:
+    uv run python -m benchmarks.compare baseline.json candidate.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any
+
+# Metrics where a higher value is better; for the others lower is better
+HIGHER_IS_BETTER = {"rps", "calls_per_second"}
+METRICS = {
+    "load": ("rps", "p50_ms", "p95_ms", "p99_ms"),
+    "micro": ("per_call_us",),
+    "startup": ("median_ms",),
+}
+
+
+def rows(results: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    if results["benchmark"] == "load":
+        return {**results["routes"], "total": results["total"]}
+    return results["cases"]
+
+
+def change(metric: str, old: float, new: float) -> str:
+    if not old:
+        return "n/a"
+    percent = (new - old) / old * 100
+    better = percent > 0 if metric in HIGHER_IS_BETTER else percent < 0
+    marker = "" if abs(percent) < 5 else (" better" if better else " WORSE")
+    return f"{percent:+.1f}%{marker}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())
+    candidate = json.loads(args.candidate.read_text())
+    if baseline["benchmark"] != candidate["benchmark"]:
+        parser.error("The files hold results of different benchmarks")
+
+    for label, results in (("baseline", baseline), ("candidate", candidate)):
+        env = results["environment"]
+        print(f"{label:<10} {env['git_revision']} (Python {env['python']})")
+
+    old_rows, new_rows = rows(baseline), rows(candidate)
+    print(f"\n{'name':<30} {'metric':<12} {'baseline':>10} {'candidate':>10} change")
+    for name in sorted(old_rows.keys() & new_rows.keys()):
+        for metric in METRICS[baseline["benchmark"]]:
+            old, new = old_rows[name].get(metric), new_rows[name].get(metric)
+            if old is None or new is None:
+                continue
+            print(
+                f"{name:<30} {metric:<12} {old:>10} {new:>10} "
+                f"{change(metric, old, new)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
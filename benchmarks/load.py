@@ -0,0 +1,372 @@
+"""
+End-to-end load test of the API.
+
+Seeds a synthetic dataset (users x tasks x tags) into a temporary SQLite
+database, then builds the app with ``app.main.create_app()`` from the
+benchmark's own settings (``--config`` and ``--set`` written to a temporary
+``config.yaml`` pointing at that database) and drives it in-process through
+an ASGI client with concurrent virtual users. Each virtual user signs in and then issues a
+weighted mix of requests until the run ends. Reports throughput and
+p50/p95/p99 latency per route.
+
+Usage:
+    uv run python -m benchmarks.load [--users 20] [--tasks 1000] [--tags 20]
+        [--virtual-users 32] [--duration 10] [--output results.json]
+        [--config config.yaml] [--set read_cache.enabled=false]
+"""
+
+import argparse
+import asyncio
+import logging
+import random
+import sqlite3
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Sequence
+
+import bcrypt
+import httpx
+
+from benchmarks.common import (
+    environment,
+    migrate,
+    parse_override,
+    prepare_workspace,
+    summarize,
+    write_results,
+)
+
+if TYPE_CHECKING:
+    from app.internal.core.settings import DatabaseSettings
+
+PASSWORD = "Bench#12345"
+# Relative weight of each operation in the request mix
+MIX = {
+    "list_tasks": 35,
+    "get_task": 25,
+    "list_tags": 15,
+    "search_tasks": 5,
+    "update_task": 12,
+    "create_task": 5,
+    "sign_in": 3,
+}
+SEARCH_WORDS = ["report", "groceries", "review", "invoice", "meeting", "garden"]
+
+
+def seed(
+    database: "DatabaseSettings", users: int, tasks: int, tags: int, bcrypt_rounds: int
+) -> dict[int, list[int]]:
+    """Insert the dataset directly with sqlite3; returns task ids per user."""
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(bcrypt_rounds)).decode()
+    user_ids = range(1, users + 1)
+
+    connection = sqlite3.connect(database.sqlite.file_name)
+    with connection:
+        connection.executemany(
+            "INSERT INTO users (id, username, password) VALUES (?, ?, ?)",
+            [(user_id, f"user{user_id}", hashed) for user_id in user_ids],
+        )
+    connection.close()
+
+    shard_files = database.shard_file_names()
+    if not shard_files:
+        return seed_shard(database.sqlite.file_name, user_ids, tasks, tags)
+
+    task_ids: dict[int, list[int]] = {}
+    for index, file_name in enumerate(shard_files):
+        shard_user_ids = [
+            user_id for user_id in user_ids if user_id % len(shard_files) == index
+        ]
+        connection = sqlite3.connect(file_name)
+        with connection:
+            # See ShardedDatabase.create_shard_user
+            connection.executemany(
+                "INSERT INTO users (id, username, password) VALUES (?, ?, '')",
+                [(user_id, f"user{user_id}") for user_id in shard_user_ids],
+            )
+        connection.close()
+        task_ids.update(seed_shard(file_name, shard_user_ids, tasks, tags))
+    return task_ids
+
+
+def seed_shard(
+    file_name: str, user_ids: Sequence[int], tasks: int, tags: int
+) -> dict[int, list[int]]:
+    """Insert the tags and tasks of ``user_ids``, who must already exist."""
+    rng = random.Random(42)
+
+    connection = sqlite3.connect(file_name)
+    with connection:
+        connection.executemany(
+            "INSERT INTO tags (user_id, name) VALUES (?, ?)",
+            [
+                (user_id, f"tag-{number}")
+                for user_id in user_ids
+                for number in range(tags)
+            ],
+        )
+        connection.executemany(
+            "INSERT INTO tasks (user_id, title, description, done) VALUES (?, ?, ?, ?)",
+            [
+                (
+                    user_id,
+                    f"Task {number}: {rng.choice(SEARCH_WORDS)}",
+                    f"Synthetic {rng.choice(SEARCH_WORDS)} task"
+                    if number % 2
+                    else None,
+                    number % 3 == 0,
+                )
+                for user_id in user_ids
+                for number in range(tasks)
+            ],
+        )
+
+        tag_ids: dict[int, list[int]] = defaultdict(list)
+        for tag_id, user_id in connection.execute("SELECT id, user_id FROM tags"):
+            tag_ids[user_id].append(tag_id)
+        task_ids: dict[int, list[int]] = defaultdict(list)
+        for task_id, user_id in connection.execute("SELECT id, user_id FROM tasks"):
+            task_ids[user_id].append(task_id)
+
+        if tags:
+            connection.executemany(
+                "INSERT INTO task_tag_links (task_id, tag_id) VALUES (?, ?)",
+                [
+                    (task_id, tag_id)
+                    for user_id, ids in task_ids.items()
+                    for task_id in ids
+                    for tag_id in rng.sample(tag_ids[user_id], min(2, tags))
+                ],
+            )
+    connection.close()
+    return task_ids
+
+
+class VirtualUser:
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        user_id: int,
+        task_ids: list[int],
+        rng: random.Random,
+        record,
+    ):
+        self.client = client
+        self.username = f"user{user_id}"
+        self.task_ids = task_ids
+        self.rng = rng
+        self.record = record
+        self.headers: dict[str, str] = {}
+
+    async def request(self, label: str, method: str, url: str, **kwargs) -> Any:
+        started = time.perf_counter()
+        response = await self.client.request(
+            method, url, headers=self.headers, **kwargs
+        )
+        self.record(label, time.perf_counter() - started, response.status_code)
+        return response
+
+    async def sign_in(self) -> None:
+        response = await self.request(
+            "POST /token",
+            "POST",
+            "/token",
+            data={"username": self.username, "password": PASSWORD},
+        )
+        if response.status_code == 200:
+            self.headers = {
+                "Authorization": f"Bearer {response.json()['access_token']}"
+            }
+
+    async def list_tasks(self) -> None:
+        params: dict[str, Any] = {"limit": 50}
+        if self.rng.random() < 0.3:
+            params["done"] = "false"
+        await self.request("GET /tasks", "GET", "/tasks", params=params)
+
+    async def get_task(self) -> None:
+        task_id = self.rng.choice(self.task_ids)
+        await self.request("GET /tasks/{task_id}", "GET", f"/tasks/{task_id}")
+
+    async def list_tags(self) -> None:
+        await self.request("GET /tags", "GET", "/tags")
+
+    async def search_tasks(self) -> None:
+        query = self.rng.choice(SEARCH_WORDS)
+        await self.request(
+            "GET /tasks/search", "GET", "/tasks/search", params={"q": query}
+        )
+
+    async def update_task(self) -> None:
+        task_id = self.rng.choice(self.task_ids)
+        await self.request(
+            "PATCH /tasks/{task_id}",
+            "PATCH",
+            f"/tasks/{task_id}",
+            json={"done": self.rng.random() < 0.5},
+        )
+
+    async def create_task(self) -> None:
+        response = await self.request(
+            "POST /tasks", "POST", "/tasks", json={"title": "Benchmark task"}
+        )
+        if response.status_code == 201:
+            self.task_ids.append(response.json()["id"])
+
+    async def run(self, deadline: float) -> None:
+        operations = list(MIX)
+        weights = list(MIX.values())
+        await self.sign_in()
+        while time.perf_counter() < deadline:
+            operation = self.rng.choices(operations, weights)[0]
+            await getattr(self, operation)()
+
+
+async def drive(
+    task_ids: dict[int, list[int]], virtual_users: int, duration: float, warmup: float
+) -> dict[str, Any]:
+    from app.main import create_app
+
+    app = create_app()
+
+    # One log line per request would dominate the client side of the run
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    recording = False
+
+    def record(label: str, elapsed: float, status_code: int) -> None:
+        if not recording:
+            return
+        latencies[label].append(elapsed)
+        if status_code >= 400:
+            errors[label] += 1
+
+    user_ids = sorted(task_ids)
+    # The ASGI transport doesn't send lifespan events
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://bench") as client,
+    ):
+        vus = [
+            VirtualUser(
+                client,
+                user_ids[index % len(user_ids)],
+                list(task_ids[user_ids[index % len(user_ids)]]),
+                random.Random(index),
+                record,
+            )
+            for index in range(virtual_users)
+        ]
+
+        if warmup:
+            deadline = time.perf_counter() + warmup
+            await asyncio.gather(*(vu.run(deadline) for vu in vus))
+
+        recording = True
+        started = time.perf_counter()
+        await asyncio.gather(*(vu.run(started + duration) for vu in vus))
+        elapsed = time.perf_counter() - started
+
+    routes = {}
+    for label in sorted(latencies):
+        routes[label] = {
+            **summarize(latencies[label], elapsed),
+            "errors": errors[label],
+        }
+    everything = [latency for values in latencies.values() for latency in values]
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "total": {**summarize(everything, elapsed), "errors": sum(errors.values())},
+        "routes": routes,
+    }
+
+
+def print_report(results: dict[str, Any]) -> None:
+    print(
+        f"\n{'route':<24} {'count':>7} {'err':>5} {'req/s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+    )
+    for label, route in [*results["routes"].items(), ("total", results["total"])]:
+        if not route["count"]:
+            continue
+        print(
+            f"{label:<24} {route['count']:>7} {route['errors']:>5} "
+            f"{route['rps']:>8.1f} {route['p50_ms']:>8.2f} "
+            f"{route['p95_ms']:>8.2f} {route['p99_ms']:>8.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--tasks", type=int, default=1000, help="Tasks per user")
+    parser.add_argument("--tags", type=int, default=20, help="Tags per user")
+    parser.add_argument("--virtual-users", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="In seconds")
+    parser.add_argument("--warmup", type=float, default=2.0, help="In seconds")
+    parser.add_argument(
+        "--config", type=Path, help="Base config.yaml (defaults to built-in settings)"
+    )
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        type=parse_override,
+        action="append",
+        default=[],
+        metavar="SECTION.KEY=VALUE",
+        help="Override a setting, e.g. password_hashing.bcrypt_rounds=10",
+    )
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+    output = args.output.resolve() if args.output else None
+    config = args.config.resolve() if args.config else None
+
+    db_path = prepare_workspace(config, args.overrides)
+    migrate(db_path)
+
+    from app.internal.core.settings import get_settings
+
+    settings = get_settings()
+    started = time.perf_counter()
+    task_ids = seed(
+        settings.database,
+        args.users,
+        args.tasks,
+        args.tags,
+        settings.password_hashing.bcrypt_rounds,
+    )
+    print(
+        f"Seeded {args.users} users x {args.tasks} tasks x {args.tags} tags "
+        f"in {time.perf_counter() - started:.1f}s ({db_path})"
+    )
+
+    results = asyncio.run(
+        drive(task_ids, args.virtual_users, args.duration, args.warmup)
+    )
+    print_report(results)
+    write_results(
+        {
+            "benchmark": "load",
+            "environment": environment(),
+            "parameters": {
+                "users": args.users,
+                "tasks": args.tasks,
+                "tags": args.tags,
+                "virtual_users": args.virtual_users,
+                "duration": args.duration,
+                "warmup": args.warmup,
+                "mix": MIX,
+                "settings": settings.model_dump(exclude={"jwt": {"secret_key"}}),
+            },
+            **results,
+        },
+        output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Micro-benchmarks of per-request CPU work.
+
+Covers the field validators, JWT creation/decoding and ``TaskPublic``
+serialization (``response_model`` path and the ``dump_task`` fast path).
+Each case reports the best time per call over several repeats.
+
+Usage:
+    uv run python -m benchmarks.micro [--repeat 5] [--output results.json]
+"""
+
+import argparse
+import timeit
+from pathlib import Path
+from typing import Any, Callable
+
+from benchmarks.common import environment, prepare_workspace, write_results
+
+
+def cases() -> dict[str, Callable[[], Any]]:
+    # Imported here: settings are only loadable once the workspace exists
+    import pydantic_core
+
+    from app.internal.core.security import create_access_token, decode_token
+    from app.internal.core.serialization import dump_task
+    from app.internal.core.settings import get_settings
+    from app.internal.core.validators import (
+        validate_password,
+        validate_task_description,
+        validate_task_title,
+        validate_username,
+    )
+    from app.internal.models.jwt import TokenData
+    from app.internal.models.tag import Tag
+    from app.internal.models.task import Task, TaskPublic
+
+    settings = get_settings()
+    token = create_access_token(
+        TokenData(sub="benchmark", uid=1, ver=0, jti="0" * 32), settings
+    ).access_token
+    tags = [Tag(id=1, name="work", user_id=1), Tag(id=2, name="urgent", user_id=1)]
+    task = Task(
+        id=1,
+        title="Prepare the quarterly report",
+        description="Collect the numbers from every team",
+        done=False,
+        user_id=1,
+        tags=tags,
+    )
+
+    return {
+        "validate_username": lambda: validate_username("Some_User-42"),
+        "validate_password": lambda: validate_password("Correct#Horse9"),
+        "validate_task_title": lambda: validate_task_title("  Buy milk  "),
+        "validate_task_description": lambda: validate_task_description("  Two  "),
+        "create_access_token": lambda: create_access_token(
+            TokenData(sub="benchmark", uid=1, ver=0, jti="0" * 32), settings
+        ),
+        "decode_token": lambda: decode_token(token, settings),
+        "task_public_model_dump_json": lambda: TaskPublic.model_validate(
+            task
+        ).model_dump_json(),
+        "task_dump_task_to_json": lambda: pydantic_core.to_json(dump_task(task)),
+    }
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> dict[str, float | int]:
+    timer = timeit.Timer(fn)
+    # Enough calls per repeat for ~0.2s of work
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+    return {
+        "calls_per_repeat": number,
+        "per_call_us": round(best * 1e6, 3),
+        "calls_per_second": round(1 / best),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+    output = args.output.resolve() if args.output else None
+
+    prepare_workspace(None, [])
+
+    results = {}
+    print(f"{'case':<30} {'per call':>12} {'calls/s':>12}")
+    for name, fn in cases().items():
+        results[name] = measure(fn, args.repeat)
+        print(
+            f"{name:<30} {results[name]['per_call_us']:>10.2f}us "
+            f"{results[name]['calls_per_second']:>12}"
+        )
+
+    write_results(
+        {
+            "benchmark": "micro",
+            "environment": environment(),
+            "parameters": {"repeat": args.repeat},
+            "cases": results,
+        },
+        output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark the list response serialization paths.
+
+Compares FastAPI's ``response_model=list[TaskPublic]`` pipeline (validate every
+ORM object, serialize, encode with the stdlib json module) with the
+``api.fast_json`` path (``dump_task`` + ``FastJSONResponse``) on in-memory
+tasks with two tags each.
+
+Usage:
+    uv run python -m benchmarks.serialization [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import asyncio
+import time
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from app.internal.core.serialization import FastJSONResponse, dump_task
+from app.internal.models.tag import Tag
+from app.internal.models.task import Task, TaskPublic
+
+
+def make_tasks(count: int) -> list[Task]:
+    tags = [Tag(id=i, name=f"tag-{i}", user_id=1) for i in range(1, 11)]
+    return [
+        Task(
+            id=i,
+            title=f"Task number {i}",
+            description="Some description of the task" if i % 2 else None,
+            done=i % 3 == 0,
+            user_id=1,
+            tags=[tags[i % 10], tags[(i + 1) % 10]],
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+async def render_response_model(route: APIRoute, tasks: list[Task]) -> bytes:
+    content = await serialize_response(
+        field=route.secure_cloned_response_field, response_content=tasks
+    )
+    return bytes(JSONResponse(content).body)
+
+
+async def render_fast_json(tasks: list[Task]) -> bytes:
+    return bytes(FastJSONResponse([dump_task(task) for task in tasks]).body)
+
+
+def best_of(repeat: int, fn) -> tuple[float, bytes]:
+    timings = []
+    body = b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        body = asyncio.run(fn())
+        timings.append(time.perf_counter() - started)
+    return min(timings), body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    route = APIRoute("/tasks", endpoint=lambda: None, response_model=list[TaskPublic])
+
+    print(f"{'tasks':>8} {'response_model':>15} {'fast_json':>10} {'speedup':>8}")
+    for size in args.sizes:
+        tasks = make_tasks(size)
+        slow, slow_body = best_of(
+            args.repeat, lambda: render_response_model(route, tasks)
+        )
+        fast, fast_body = best_of(args.repeat, lambda: render_fast_json(tasks))
+        assert slow_body == fast_body, "fast_json output differs from TaskPublic"
+        print(
+            f"{size:>8} {slow * 1000:>13.1f}ms {fast * 1000:>8.1f}ms "
+            f"{slow / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
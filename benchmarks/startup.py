@@ -0,0 +1,157 @@
+"""
+Import-time and startup benchmark.
+
+Each run is a fresh interpreter (so nothing is cached in ``sys.modules``)
+which times, in order: ``import app.main``, ``create_app()``, the lifespan
+startup (engines and hashing pool), the first request (``GET /health``) and
+the shutdown. ``import app.main`` must stay cheap and must not read
+``config.yaml``; both are reported so that regressions show up.
+
+Usage:
+    uv run python -m benchmarks.startup [--runs 10] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.common import (
+    REPO_ROOT,
+    environment,
+    migrate,
+    parse_override,
+    prepare_workspace,
+    write_results,
+)
+
+# Run in the child interpreter; only the standard library is imported before
+# the first measurement
+CHILD = """
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+modules = len(sys.modules)
+import app.main
+import_seconds = time.perf_counter() - started
+import_modules = len(sys.modules) - modules
+
+from app.internal.core import settings
+settings_read_at_import = settings._settings is not None
+
+
+async def serve():
+    import httpx
+
+    timings = {}
+    started = time.perf_counter()
+    application = app.main.create_app()
+    timings["create_app"] = time.perf_counter() - started
+
+    lifespan = application.router.lifespan_context(application)
+    started = time.perf_counter()
+    await lifespan.__aenter__()
+    timings["startup"] = time.perf_counter() - started
+
+    transport = httpx.ASGITransport(app=application)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        response = await client.get("/health")
+        timings["first_request"] = time.perf_counter() - started
+        response.raise_for_status()
+
+    started = time.perf_counter()
+    await lifespan.__aexit__(None, None, None)
+    timings["shutdown"] = time.perf_counter() - started
+    return timings
+
+
+timings = {"import": import_seconds, **asyncio.run(serve())}
+print(json.dumps({
+    "timings": timings,
+    "import_modules": import_modules,
+    "settings_read_at_import": settings_read_at_import,
+}))
+"""
+
+PHASES = ("import", "create_app", "startup", "first_request", "shutdown")
+
+
+def run_child() -> dict:
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT)}
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - started
+    result = json.loads(process.stdout.strip().splitlines()[-1])
+    result["timings"]["process"] = wall
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--config", type=Path, help="Base config.yaml (defaults to built-in settings)"
+    )
+    parser.add_argument(
+        "--set",
+        dest="overrides",
+        type=parse_override,
+        action="append",
+        default=[],
+        metavar="SECTION.KEY=VALUE",
+        help="Override a setting, e.g. profiling.enabled=true",
+    )
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+    output = args.output.resolve() if args.output else None
+    config = args.config.resolve() if args.config else None
+
+    migrate(prepare_workspace(config, args.overrides))
+
+    runs = [run_child() for _ in range(args.runs)]
+    cases = {}
+    print(f"{'phase':<16} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+    for phase in (*PHASES, "process"):
+        ms = [run["timings"][phase] * 1000 for run in runs]
+        cases[phase] = {
+            "median_ms": round(statistics.median(ms), 3),
+            "min_ms": round(min(ms), 3),
+            "max_ms": round(max(ms), 3),
+        }
+        print(
+            f"{phase:<16} {cases[phase]['median_ms']:>10.2f} "
+            f"{cases[phase]['min_ms']:>10.2f} {cases[phase]['max_ms']:>10.2f}"
+        )
+
+    import_modules = runs[-1]["import_modules"]
+    settings_read = any(run["settings_read_at_import"] for run in runs)
+    print(f"\nModules loaded by 'import app.main': {import_modules}")
+    if settings_read:
+        print("WARNING: 'import app.main' read config.yaml")
+
+    write_results(
+        {
+            "benchmark": "startup",
+            "environment": environment(),
+            "parameters": {"runs": args.runs, "overrides": args.overrides},
+            "import_modules": import_modules,
+            "settings_read_at_import": settings_read,
+            "cases": cases,
+        },
+        output,
+    )
+
+
+if __name__ == "__main__":
+    main()
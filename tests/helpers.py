@@ -0,0 +1,73 @@
+"""
+Shared setup for the tests: a migrated database in a temporary directory and
+an app built on it.
+
+Run the tests from the project root with ``uv run python -m unittest``.
+"""
+
+import argparse
+import tempfile
+import unittest
+from pathlib import Path
+
+from alembic.config import Config
+from fastapi.testclient import TestClient
+
+from alembic import command
+from app.internal.core.settings import (
+    DatabaseSettings,
+    JwtSettings,
+    LoginThrottleSettings,
+    PasswordHashingSettings,
+    Settings,
+    SqliteSettings,
+)
+from app.main import create_app
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+PASSWORD = "Secret#123"
+
+
+def migrate(database_file: Path) -> None:
+    config = Config(
+        str(PROJECT_DIR / "alembic.ini"),
+        cmd_opts=argparse.Namespace(x=["shards=0"]),
+    )
+    config.set_main_option("script_location", str(PROJECT_DIR / "alembic"))
+    config.set_main_option("sqlalchemy.url", f"sqlite:///{database_file}")
+    command.upgrade(config, "head")
+
+
+def make_settings(database_file: Path) -> Settings:
+    return Settings(
+        database=DatabaseSettings(sqlite=SqliteSettings(file_name=str(database_file))),
+        jwt=JwtSettings(secret_key="test-secret-" + "x" * 32),
+        # Minimum bcrypt cost, and no sign-in limits between test users
+        password_hashing=PasswordHashingSettings(bcrypt_rounds=4),
+        login_throttle=LoginThrottleSettings(enabled=False),
+    )
+
+
+class AppTestCase(unittest.TestCase):
+    """Runs each test against a fresh, migrated database."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        database_file = Path(directory.name) / "database.db"
+        migrate(database_file)
+
+        self.settings = make_settings(database_file)
+        self.configure(self.settings)
+        self.app = create_app(self.settings)
+        self.client = self.enterContext(TestClient(self.app))
+
+    def configure(self, settings: Settings) -> None:
+        """Override to change the settings before the app is created."""
+
+    def sign_in(self, username: str) -> dict[str, str]:
+        """Sign up ``username`` and return its authorization header."""
+        credentials = {"username": username, "password": PASSWORD}
+        self.client.post("/auth/sign-up", json=credentials)
+        response = self.client.post("/token", data=credentials)
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,95 @@
+"""
+``GET /changes`` must give its change feed back to the hub however the
+stream ends, or the user runs out of connections and gets 429 for good.
+"""
+
+import asyncio
+
+from app.internal.core.settings import Settings
+from tests.helpers import AppTestCase
+
+MAX_CONNECTIONS = 2
+
+
+class ChangeFeedDisconnectTest(AppTestCase):
+    def configure(self, settings: Settings) -> None:
+        settings.change_feed.max_connections_per_user = MAX_CONNECTIONS
+
+    def setUp(self):
+        super().setUp()
+        self.headers = self.sign_in("alice")
+        self.hub = self.app.state.change_hub
+
+    def open_feed(self, spec_version: str, fail_send: bool) -> list[dict]:
+        """
+        Call the app directly, as the test client buffers the whole response
+        and would wait forever on the stream. The client is gone before the
+        stream starts: ``http.disconnect`` comes right after the request while
+        sending the response headers stalls, and with ``fail_send`` sending
+        fails like on a closed socket.
+        """
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0", "spec_version": spec_version},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/changes",
+            "raw_path": b"/changes",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [
+                (name.lower().encode(), value.encode())
+                for name, value in self.headers.items()
+            ],
+            "client": ("testclient", 50000),
+            "server": ("testserver", 80),
+        }
+        incoming = [{"type": "http.request", "body": b"", "more_body": False}]
+        sent: list[dict] = []
+
+        async def receive():
+            return incoming.pop(0) if incoming else {"type": "http.disconnect"}
+
+        async def send(message):
+            if fail_send:
+                raise OSError("Connection reset by peer")
+            sent.append(message)
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                # Until the disconnect cancels the response
+                await asyncio.Event().wait()
+
+        async def call():
+            try:
+                await self.app(scope, receive, send)
+            except Exception:
+                # The server's job; the client is gone either way
+                pass
+
+        self.client.portal.call(call)
+        return sent
+
+    def assert_feeds_released(self, spec_version: str, fail_send: bool) -> None:
+        for _ in range(MAX_CONNECTIONS + 1):
+            sent = self.open_feed(spec_version, fail_send)
+            self.assertEqual(self.hub.connections, 0)
+            if not fail_send:
+                self.assertEqual(sent[0]["status"], 200)
+
+    def test_disconnect_before_first_event(self):
+        self.assert_feeds_released("2.3", fail_send=False)
+
+    def test_send_fails_before_first_event(self):
+        self.assert_feeds_released("2.4", fail_send=True)
+
+    def test_connection_limit(self):
+        user_id = self.client.get("/auth/me", headers=self.headers).json()["id"]
+
+        async def subscribe():
+            return self.hub.subscribe(user_id)
+
+        for _ in range(MAX_CONNECTIONS):
+            self.addCleanup(self.hub.unsubscribe, self.client.portal.call(subscribe))
+        sent = self.open_feed("2.3", fail_send=False)
+        self.assertEqual(sent[0]["status"], 429)
+        self.assertEqual(self.hub.connections, MAX_CONNECTIONS)
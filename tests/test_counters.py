@@ -0,0 +1,109 @@
+"""
+The counters kept by database triggers match a recount after every write
+path: single, batch and bulk UPDATE writes, imports and deletes.
+"""
+
+from app.commands.recompute_task_stats import recompute_task_stats
+from app.commands.reconcile_tag_counts import reconcile_tag_counts
+from tests.helpers import AppTestCase
+
+
+class CounterDriftTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.headers = self.sign_in("alice")
+
+    def post(self, path: str, headers: dict[str, str] | None = None, **kwargs):
+        headers = {**self.headers, **(headers or {})}
+        response = self.client.post(path, headers=headers, **kwargs)
+        self.assertLess(response.status_code, 300, response.text)
+        return response.json()
+
+    def patch(self, path: str, json):
+        response = self.client.patch(path, json=json, headers=self.headers)
+        self.assertLess(response.status_code, 300, response.text)
+        return response.json()
+
+    def delete(self, path: str, **kwargs) -> None:
+        response = self.client.delete(path, headers=self.headers, **kwargs)
+        self.assertLess(response.status_code, 300, response.text)
+
+    def run_write_paths(self) -> None:
+        work, home, errand = (
+            self.post("/tags", json={"name": name})["id"]
+            for name in ("work", "home", "errand")
+        )
+
+        # Single task writes
+        task = self.post("/tasks", json={"title": "single", "tag_ids": [work, home]})
+        self.patch(f"/tasks/{task['id']}", {"done": True})
+        self.patch(f"/tasks/{task['id']}", {"tag_ids": [home, errand]})
+        doomed = self.post("/tasks", json={"title": "doomed", "tag_ids": [work]})
+        self.delete(f"/tasks/{doomed['id']}")
+
+        # Batch writes; the PATCH is an ORM bulk UPDATE
+        created = self.post(
+            "/tasks/batch",
+            json=[
+                {"title": "batch one", "tag_ids": [work]},
+                {"title": "batch two", "tag_ids": [work, errand], "done": True},
+                {"title": "batch three"},
+                {"title": "batch four", "tag_ids": [home]},
+            ],
+        )
+        one, two, three, four = (result["id"] for result in created)
+        self.patch(
+            "/tasks/batch",
+            [
+                {"id": one, "done": True},
+                {"id": two, "done": False, "tag_ids": [home]},
+                {"id": three, "tag_ids": [errand]},
+                {"id": four, "tag_ids": []},
+            ],
+        )
+        self.delete("/tasks/batch", params={"ids": [one, four]})
+
+        # Import, creating a tag on the way
+        self.post(
+            "/tasks/import",
+            params={"format": "ndjson"},
+            content=(
+                b'{"title": "imported", "done": true, "tags": ["work", "fresh"]}\n'
+                b'{"title": "imported too", "tags": ["fresh"]}\n'
+            ),
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+        # Deleting a tag unlinks it from its tasks
+        self.delete(f"/tags/{errand}")
+
+    def drift(self, count_drifted) -> int:
+        """Run a maintenance command's dry run on the app's shard."""
+        shard = self.app.state.database.shards[0]
+
+        async def dry_run() -> int:
+            async with shard.read_session() as session:
+                return await count_drifted(session, dry_run=True)
+
+        return self.client.portal.call(dry_run)
+
+    def test_tag_counts_match_links(self):
+        self.run_write_paths()
+
+        self.assertEqual(self.drift(reconcile_tag_counts), 0)
+        counts = {
+            tag["name"]: (tag["task_count"], tag["open_task_count"])
+            for tag in self.client.get("/tags", headers=self.headers).json()
+        }
+        self.assertEqual(counts["work"], (1, 0))
+        self.assertEqual(counts["fresh"], (2, 1))
+
+    def test_task_stats_match_tasks(self):
+        self.run_write_paths()
+
+        self.assertEqual(self.drift(recompute_task_stats), 0)
+        stats = self.client.get("/tasks/stats", headers=self.headers).json()
+        self.assertEqual(stats["task_count"], 5)
+        self.assertEqual(stats["done_task_count"], 2)
+        # "batch three" lost its last tag with errand
+        self.assertEqual(stats["untagged_task_count"], 1)
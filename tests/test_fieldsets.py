@@ -0,0 +1,31 @@
+"""
+Sparse fieldsets return the same representation of a task, only with fewer
+fields: tags have the keys of ``TagPublic`` in its order on every path.
+"""
+
+from tests.helpers import AppTestCase
+
+
+class TaskFieldsetTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.headers = self.sign_in("alice")
+        tag_id = self.client.post(
+            "/tags", json={"name": "work"}, headers=self.headers
+        ).json()["id"]
+        self.client.post(
+            "/tasks", json={"title": "first", "tag_ids": [tag_id]}, headers=self.headers
+        )
+
+    def get_tasks(self, **params) -> list[dict]:
+        return self.client.get("/tasks", params=params, headers=self.headers).json()
+
+    def test_sparse_tags_match_full_tags(self):
+        [full] = self.get_tasks()
+        [sparse] = self.get_tasks(fields="title", include="tags")
+
+        self.assertEqual(list(sparse), ["title", "id", "tags"])
+        self.assertEqual(
+            [list(tag.items()) for tag in sparse["tags"]],
+            [list(tag.items()) for tag in full["tags"]],
+        )
@@ -0,0 +1,115 @@
+"""
+Behaviour of ``GroupCommitter`` with group commit enabled: writes of one group
+are isolated from each other, and their results wait for the COMMIT.
+"""
+
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+
+from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.internal.core.db import SqliteDatabase
+from app.internal.core.group_commit import GroupCommitter
+from app.internal.core.settings import GroupCommitSettings, SqliteSettings
+from app.internal.models.user import User
+from tests.helpers import migrate
+
+# Long enough for the writes of a test to be queued in the same group
+GROUP_COMMIT = GroupCommitSettings(enabled=True, window_ms=50)
+
+
+class GroupCommitTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        database_file = Path(directory.name) / "database.db"
+        migrate(database_file)
+
+        self.database = SqliteDatabase(
+            SqliteSettings(file_name=str(database_file)), GROUP_COMMIT
+        )
+        self.addAsyncCleanup(self.database.dispose)
+        # Every COMMIT of the writer, in order with the results handed back
+        self.events: list[str] = []
+
+    def committer(self, fail_commit: bool = False) -> GroupCommitter:
+        events = self.events
+
+        class RecordingSession(AsyncSession):
+            async def commit(self) -> None:
+                if fail_commit:
+                    raise OperationalError("COMMIT", {}, Exception("disk I/O error"))
+                await super().commit()
+                events.append("commit")
+
+        return GroupCommitter(
+            lambda: RecordingSession(self.database.writer, expire_on_commit=False),
+            GROUP_COMMIT,
+            "test",
+        )
+
+    def add_user(self, username: str, fail: bool = False):
+        async def write(session: AsyncSession) -> str:
+            session.add(User(username=username, password=""))
+            await session.flush()
+            if fail:
+                raise HTTPException(status_code=404, detail="Task not found")
+            return username
+
+        return write
+
+    async def run_write(self, committer: GroupCommitter, write) -> str:
+        result = await committer.run(write)
+        self.events.append(f"result {result}")
+        return result
+
+    async def usernames(self) -> list[str]:
+        async with self.database.read_session() as session:
+            result = await session.exec(select(User.username).order_by(User.username))
+            return list(result.all())
+
+    async def test_failing_write_is_rolled_back_alone(self):
+        committer = self.committer()
+
+        results = await asyncio.gather(
+            self.run_write(committer, self.add_user("alice")),
+            self.run_write(committer, self.add_user("bobby", fail=True)),
+            self.run_write(committer, self.add_user("carol")),
+            return_exceptions=True,
+        )
+
+        self.assertEqual(results[0], "alice")
+        self.assertIsInstance(results[1], HTTPException)
+        self.assertEqual(results[1].status_code, 404)
+        self.assertEqual(results[2], "carol")
+        # One transaction for the group, committed before any result
+        self.assertEqual(self.events, ["commit", "result alice", "result carol"])
+        self.assertEqual(await self.usernames(), ["alice", "carol"])
+
+    async def test_failed_commit_fails_the_whole_group(self):
+        committer = self.committer(fail_commit=True)
+
+        results = await asyncio.gather(
+            self.run_write(committer, self.add_user("alice")),
+            self.run_write(committer, self.add_user("bobby")),
+            return_exceptions=True,
+        )
+
+        for result in results:
+            self.assertIsInstance(result, OperationalError)
+        self.assertEqual(self.events, [])
+        self.assertEqual(await self.usernames(), [])
+
+    async def test_write_alone_in_its_group_fails_without_savepoint(self):
+        committer = self.committer()
+
+        with self.assertRaises(HTTPException):
+            await committer.run(self.add_user("alice", fail=True))
+        self.assertEqual(await committer.run(self.add_user("bobby")), "bobby")
+
+        self.assertEqual(await self.usernames(), ["bobby"])
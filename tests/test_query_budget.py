@@ -0,0 +1,132 @@
+"""
+Pins the number of SQL statements the single-resource routes run, so that a
+change adding a lazy load or an extra round trip fails here instead of showing
+up as a slower endpoint.
+"""
+
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.internal.core.settings import Settings
+from tests.helpers import AppTestCase
+
+
+class QueryBudgetTest(AppTestCase):
+    def configure(self, settings: Settings) -> None:
+        # Cached reads would skip the queries being counted
+        settings.read_cache.enabled = False
+
+    def setUp(self):
+        super().setUp()
+        self.headers = self.sign_in("alice")
+        self.other_headers = self.sign_in("bobby")
+
+        self.tag_ids = [
+            self.client.post("/tags", json={"name": name}, headers=self.headers).json()[
+                "id"
+            ]
+            for name in ("work", "home", "errand")
+        ]
+        self.task_id = self.create_task("first")
+
+    def create_task(self, title: str) -> int:
+        response = self.client.post(
+            "/tasks",
+            json={"title": title, "tag_ids": self.tag_ids},
+            headers=self.headers,
+        )
+        return response.json()["id"]
+
+    @contextmanager
+    def assert_statements(self, budget: int):
+        """Fail if the block runs other than ``budget`` statements."""
+        statements: list[str] = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            # The writer's BEGIN IMMEDIATE is transaction control, not a query
+            if not statement.startswith("BEGIN"):
+                statements.append(statement)
+
+        engines = [
+            engine.sync_engine
+            for database in self.app.state.database.databases()
+            for engine in (database.writer, database.reader)
+        ]
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", count)
+        try:
+            yield
+        finally:
+            for engine in engines:
+                event.remove(engine, "before_cursor_execute", count)
+        self.assertEqual(len(statements), budget, "\n".join(statements))
+
+    def test_get_task(self):
+        # User, data version for the ETag, task with its tags
+        with self.assert_statements(3):
+            response = self.client.get(f"/tasks/{self.task_id}", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["tags"]), 3)
+
+    def test_get_unowned_task(self):
+        with self.assert_statements(4):
+            response = self.client.get(
+                f"/tasks/{self.task_id}", headers=self.other_headers
+            )
+        self.assertEqual(response.status_code, 403)
+
+    def test_update_task(self):
+        # User, task, update, data version bump
+        with self.assert_statements(4):
+            response = self.client.patch(
+                f"/tasks/{self.task_id}", json={"done": True}, headers=self.headers
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_task_tags(self):
+        # Plus the current tags and one statement unlinking all of them
+        with self.assert_statements(5):
+            response = self.client.patch(
+                f"/tasks/{self.task_id}", json={"tag_ids": []}, headers=self.headers
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["tags"], [])
+
+    def test_delete_task(self):
+        # User, task, links, task row, data version bump
+        with self.assert_statements(5):
+            response = self.client.delete(
+                f"/tasks/{self.task_id}", headers=self.headers
+            )
+        self.assertEqual(response.status_code, 204)
+
+    def test_get_tag(self):
+        with self.assert_statements(3):
+            response = self.client.get(f"/tags/{self.tag_ids[0]}", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_get_unowned_tag(self):
+        with self.assert_statements(4):
+            response = self.client.get(
+                f"/tags/{self.tag_ids[0]}", headers=self.other_headers
+            )
+        self.assertEqual(response.status_code, 403)
+
+    def test_update_tag(self):
+        with self.assert_statements(4):
+            response = self.client.patch(
+                f"/tags/{self.tag_ids[0]}",
+                json={"name": "office"},
+                headers=self.headers,
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_delete_tag(self):
+        # Independent of how many tasks use the tag
+        self.create_task("second")
+        with self.assert_statements(5):
+            response = self.client.delete(
+                f"/tags/{self.tag_ids[0]}", headers=self.headers
+            )
+        self.assertEqual(response.status_code, 204)
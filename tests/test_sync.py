@@ -0,0 +1,115 @@
+"""
+``GET /sync`` cursors: incremental syncs report deletions, full syncs leave
+out the old ones, and pruned tombstones expire the cursors that needed them.
+"""
+
+from sqlmodel import col, update
+
+from app.commands.prune_tombstones import prune_tombstones
+from app.internal.models import Tombstone
+from tests.helpers import AppTestCase
+
+DAY = 24 * 60 * 60
+
+
+class SyncTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.headers = self.sign_in("alice")
+
+    def create_task(self, title: str) -> int:
+        response = self.client.post(
+            "/tasks", json={"title": title}, headers=self.headers
+        )
+        return response.json()["id"]
+
+    def delete_task(self, task_id: int) -> None:
+        self.client.delete(f"/tasks/{task_id}", headers=self.headers)
+
+    def sync(self, since: str | None = None, limit: int = 100):
+        params: dict[str, str | int] = {"limit": limit}
+        if since:
+            params["since"] = since
+        return self.client.get("/sync", params=params, headers=self.headers)
+
+    def sync_all(self, since: str | None = None, limit: int = 100) -> dict:
+        """Page through ``GET /sync``; return the merged pages and last cursor."""
+        merged: dict = {"tasks": [], "deleted": [], "cursor": since}
+        while True:
+            page = self.sync(merged["cursor"], limit).json()
+            merged["tasks"] += [task["title"] for task in page["tasks"]]
+            merged["deleted"] += page["deleted"]["tasks"]
+            merged["cursor"] = page["cursor"]
+            if not page["has_more"]:
+                return merged
+
+    def test_incremental_sync_reports_deletes(self):
+        kept = self.create_task("kept")
+        removed = self.create_task("removed")
+        # Not the last id, which SQLite would hand out again
+        self.create_task("last")
+        cursor = self.sync_all()["cursor"]
+
+        self.delete_task(removed)
+        self.client.patch(f"/tasks/{kept}", json={"done": True}, headers=self.headers)
+        self.create_task("added")
+
+        changes = self.sync_all(cursor)
+        self.assertEqual(changes["deleted"], [removed])
+        self.assertEqual(changes["tasks"], ["kept", "added"])
+        # Up to date now
+        self.assertEqual(self.sync_all(changes["cursor"])["tasks"], [])
+        self.assertEqual(self.sync_all(changes["cursor"])["deleted"], [])
+
+    def test_full_sync_leaves_out_earlier_deletes(self):
+        for title in ("first", "second", "third"):
+            self.delete_task(self.create_task(title))
+        self.create_task("kept")
+
+        changes = self.sync_all(limit=1)
+
+        self.assertEqual(changes["tasks"], ["kept"])
+        self.assertEqual(changes["deleted"], [])
+
+    def test_full_sync_reports_deletes_while_paging(self):
+        task_ids = [self.create_task(title) for title in ("first", "second", "third")]
+
+        first_page = self.sync(limit=1).json()
+        self.assertEqual([task["id"] for task in first_page["tasks"]], task_ids[:1])
+        self.delete_task(task_ids[0])
+
+        rest = self.sync_all(first_page["cursor"], limit=1)
+        self.assertEqual(rest["tasks"], ["second", "third"])
+        self.assertEqual(rest["deleted"], task_ids[:1])
+
+    def prune(self, age_days: float) -> int:
+        """Age every tombstone by ``age_days`` and prune with a 1 day retention."""
+        shard = self.app.state.database.shards[0]
+
+        async def age_and_prune() -> int:
+            async with shard.write_session() as session:
+                await session.execute(
+                    update(Tombstone).values(
+                        deleted_at=col(Tombstone.deleted_at) - int(age_days * DAY)
+                    )
+                )
+                await session.commit()
+                return await prune_tombstones(session, retention_days=1)
+
+        return self.client.portal.call(age_and_prune)
+
+    def test_pruned_tombstones_expire_older_cursors(self):
+        removed = self.create_task("removed")
+        stale_cursor = self.sync_all()["cursor"]
+        self.delete_task(removed)
+        current_cursor = self.sync_all(stale_cursor)["cursor"]
+
+        self.assertEqual(self.prune(age_days=0.5), 0)
+        self.assertEqual(self.sync_all(stale_cursor)["deleted"], [removed])
+
+        self.assertEqual(self.prune(age_days=1), 1)
+        response = self.sync(stale_cursor)
+        self.assertEqual(response.status_code, 410)
+        # Cursors from after the delete don't need its tombstone
+        self.assertEqual(self.sync(current_cursor).status_code, 200)
+        self.assertEqual(self.sync().status_code, 200)
@@ -0,0 +1,69 @@
+"""
+The batch routes report each item on its own: an invalid item is skipped with
+its status, and the others are still written.
+"""
+
+from tests.helpers import AppTestCase
+
+
+class TaskBatchUpdateTest(AppTestCase):
+    def setUp(self):
+        super().setUp()
+        self.headers = self.sign_in("alice")
+        response = self.client.post(
+            "/tasks/batch",
+            json=[{"title": "first"}, {"title": "second"}, {"title": "third"}],
+            headers=self.headers,
+        )
+        self.task_ids = [result["id"] for result in response.json()]
+
+    def get_task(self, task_id: int) -> dict:
+        return self.client.get(f"/tasks/{task_id}", headers=self.headers).json()
+
+    def test_null_in_required_field_skips_only_that_item(self):
+        tag_id = self.client.post(
+            "/tags", json={"name": "work"}, headers=self.headers
+        ).json()["id"]
+        first, second, third = self.task_ids
+
+        response = self.client.patch(
+            "/tasks/batch",
+            json=[
+                {"id": first, "done": True},
+                {"id": second, "title": None, "tag_ids": [tag_id]},
+                {"id": third, "done": None},
+            ],
+            headers=self.headers,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(result["status"], result["detail"]) for result in response.json()],
+            [
+                (200, None),
+                (400, "Fields cannot be null: title"),
+                (400, "Fields cannot be null: done"),
+            ],
+        )
+        self.assertTrue(self.get_task(first)["done"])
+        # Nothing of the rejected items was written, tags included
+        self.assertEqual(self.get_task(second)["title"], "second")
+        self.assertEqual(self.get_task(second)["tags"], [])
+        self.assertFalse(self.get_task(third)["done"])
+
+    def test_null_in_nullable_field_is_written(self):
+        task_id = self.task_ids[0]
+        self.client.patch(
+            "/tasks/batch",
+            json=[{"id": task_id, "description": "notes"}],
+            headers=self.headers,
+        )
+
+        response = self.client.patch(
+            "/tasks/batch",
+            json=[{"id": task_id, "description": None}],
+            headers=self.headers,
+        )
+
+        self.assertEqual(response.json()[0]["status"], 200)
+        self.assertIsNone(self.get_task(task_id)["description"])